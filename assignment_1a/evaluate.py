@@ -1,27 +1,39 @@
 # evaluate.py
+# Run from the root directory: python -m assignment_1a.evaluate [--workers N] [--output results.json]
 
-from read_data import (
-    test_sentences, test_label, train_sentences, train_label,
-    train_data_bow, dedup_train_data_bow, unique_train_labels,
-    vectorizer
-)
-from models import (
+from assignment_1a.read_data import corpus
+from assignment_1a.training_cache import train_or_load
+from assignment_1a.models import (
     Model, MajorityClassModel, RuleBasedModel, DecisionTreeModel,
     LogisticRegressionModel, FeedForwardNNModel
 )
 
 import numpy as np
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import time
 import os
 
-def evaluate_model(model: Model, data, labels, label_set):
+# (model class, data type) for every model that gets evaluated, in reporting order
+MODEL_SPECS = [
+    (MajorityClassModel, 'normal'),
+    (RuleBasedModel, 'normal'),
+    (DecisionTreeModel, 'normal'),
+    (LogisticRegressionModel, 'normal'),
+    (FeedForwardNNModel, 'normal'),
+    (DecisionTreeModel, 'dedup'),
+    (LogisticRegressionModel, 'dedup'),
+    (FeedForwardNNModel, 'dedup'),
+]
+
+# Models left out of the difficult sentence analysis
+BASELINE_MODELS = ['Majority class model', 'Rule-based model']
+
+def evaluate_model(model: Model, data, labels, label_set, verbose=True):
     """Evaluates the model and prints detailed metrics."""
-    if hasattr(model, 'predict_batch'):
-        print(f"Using batch prediction for {model.name}")
-        predictions = model.predict_batch(data)
-    else:
-        print(f"Using individual predictions for {model.name}")
-        predictions = [model.predict(sentence) for sentence in data]
+    predictions = model.predict_batch(data)
 
     # Check if all predictions are in label_set
     unique_predictions = set(predictions)
@@ -31,130 +43,134 @@ def evaluate_model(model: Model, data, labels, label_set):
 
     # Compute overall accuracy
     accuracy = accuracy_score(labels, predictions)
-    print(f"Accuracy of {model.name}: {accuracy:.2%}")
 
     # Compute precision, recall, F1-score per class
     report = classification_report(
         labels, predictions, labels=label_set, zero_division=0
     )
-    print(f"Classification Report for {model.name}:\n{report}")
 
     # Compute confusion matrix
     cm = confusion_matrix(labels, predictions, labels=label_set)
-    print(f"Confusion Matrix for {model.name}:\n{cm}")
+
+    if verbose:
+        print(f"Accuracy of {model.name}: {accuracy:.2%}")
+        print(f"Classification Report for {model.name}:\n{report}")
+        print(f"Confusion Matrix for {model.name}:\n{cm}")
 
     return predictions, accuracy, report, cm
 
+def build_model(model_class, data_type):
+    """Creates a model on the training data that matches its data type."""
+    if model_class in (MajorityClassModel, RuleBasedModel):
+        return model_class(corpus.train_sentences, corpus.train_label)
+    if data_type == 'dedup':
+        data, labels = corpus.dedup_train_data_bow, corpus.unique_train_labels
+    else:
+        data, labels = corpus.train_data_bow, corpus.train_label
+    return model_class(data, labels, data_type=data_type, vectorizer=corpus.vectorizer)
+
+def run_model(spec):
+    """Loads or trains one model and evaluates it on the test split. Runs in a worker process."""
+    model_class, data_type = spec
+    start = time.perf_counter()
+    model = build_model(model_class, data_type)
+    if hasattr(model, 'train'):
+        # Weights are reused only if they were trained on the same data and hyperparameters
+        if train_or_load(corpus, model):
+            status = f"Loaded cached weights for {model.name}"
+        else:
+            status = f"Trained and cached weights for {model.name}"
+    else:
+        status = f"No training needed for {model.name}"
+    ready = time.perf_counter()
+
+    label_set = sorted(set(corpus.train_label))
+    result = {'model': model.name, 'data_type': data_type, 'status': status}
+    try:
+        predictions, accuracy, report, cm = evaluate_model(
+            model, corpus.test_sentences, corpus.test_label, label_set, verbose=False
+        )
+    except ValueError as ve:
+        result['error'] = str(ve)
+        return result
+    result.update({
+        'accuracy': accuracy,
+        'report': report,
+        'per_class': classification_report(
+            corpus.test_label, predictions, labels=label_set, zero_division=0, output_dict=True
+        ),
+        'confusion_matrix': cm.tolist(),
+        'labels': label_set,
+        'load_or_train_seconds': ready - start,
+        'predict_seconds': time.perf_counter() - ready,
+        'wall_seconds': time.perf_counter() - start,
+        'predictions': list(predictions),
+    })
+    return result
+
+def difficult_sentences(model_predictions: dict, sentences, labels, top=5):
+    """Ranks test sentences by how many models misclassify them, using one comparison over a prediction matrix."""
+    names = list(model_predictions)
+    prediction_matrix = np.array([model_predictions[name] for name in names])
+    misclassified = prediction_matrix != np.array(labels)
+    counts = misclassified.sum(axis=0)
+    order = np.argsort(-counts, kind='stable')
+    return [
+        {
+            'sentence': sentences[i],
+            'true_label': labels[i],
+            'misclassified_by': [names[m] for m in np.flatnonzero(misclassified[:, i])],
+        }
+        for i in order[:top] if counts[i] > 0
+    ]
+
 if __name__ == "__main__":
-    # Initialize any required variables
-    all_model_predictions = {}
+    parser = argparse.ArgumentParser(description="Evaluate every dialog act classifier on the test split.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default=os.path.join("assignment_1a", "evaluation_results.json"))
+    args = parser.parse_args()
 
-    # Get the set of labels
-    label_set = sorted(set(train_label))
-
-    # Initialize the models with the original training data
-    print("Evaluating models with original data:")
-    mcm_orig = MajorityClassModel(train_sentences, train_label)  # Majority Class Model
-    rbm_orig = RuleBasedModel(train_sentences, train_label)      # Rule-Based Model
-    dtm_orig = DecisionTreeModel(train_data_bow, train_label, data_type='normal')  # Decision Tree Model
-    lrm_orig = LogisticRegressionModel(train_data_bow, train_label, data_type='normal')  # Logistic Regression Model
-    ffnn_orig = FeedForwardNNModel(train_data_bow, train_label, data_type='normal')  # Feed Forward NN Model
-
-    models_orig = [mcm_orig, rbm_orig, dtm_orig, lrm_orig, ffnn_orig]
-
-    # Handle training and weight saving/loading for original data models
-    for model in models_orig:
-        print(f"\nEvaluating {model.name} with original data:")
-        if hasattr(model, 'weights_path') and os.path.exists(model.weights_path):
-            # Load existing weights
-            model.load_weights()
-            print(f"Loaded weights for {model.name}")
-        else:
-            # Train the model and save weights
-            if hasattr(model, 'train'):
-                print(f"Training {model.name}")
-                model.train()
-                if hasattr(model, 'save_weights'):
-                    # Ensure the directory exists
-                    weights_dir = os.path.dirname(model.weights_path)
-                    if not os.path.exists(weights_dir):
-                        os.makedirs(weights_dir)
-                    model.save_weights()
-                    print(f"Saved weights for {model.name}")
-        # Evaluate the model
-        try:
-            predictions, accuracy, report, cm = evaluate_model(
-                model, test_sentences, test_label, label_set
-            )
-            # Store predictions for error analysis, excluding models that do not require it
-            if model.name not in ['Majority class model', 'Rule-based model']:
-                all_model_predictions[model.name] = predictions
-        except ValueError as ve:
-            print(f"Error evaluating {model.name}: {ve}")
+    # Build the corpus once; forked workers inherit it instead of recomputing it
+    corpus.build()
+    corpus.save_vectorizer()
+    test_sentences, test_label = corpus.test_sentences, corpus.test_label
 
-    # Error analysis: identify difficult sentences (misclassified by most models)
-    print("\nIdentifying difficult sentences misclassified by most models:")
-    misclassification_counts = {}
-    for idx, sentence in enumerate(test_sentences):
-        true_label = test_label[idx]
-        misclassified_by = []
-        for model_name, predictions in all_model_predictions.items():
-            if predictions[idx] != true_label:
-                misclassified_by.append(model_name)
-        if len(misclassified_by) > 0:
-            misclassification_counts[sentence] = {
-                'true_label': true_label,
-                'misclassified_by': misclassified_by
-            }
-
-    # Find sentences misclassified by the most models
-    difficult_sentences = sorted(
-        misclassification_counts.items(),
-        key=lambda x: len(x[1]['misclassified_by']),
-        reverse=True
-    )
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(run_model, MODEL_SPECS))
+    total_seconds = time.perf_counter() - start
 
-    # Print out the top difficult sentences
+    all_model_predictions = {}
+    for result in results:
+        print(f"\nEvaluating {result['model']} with {'deduplicated' if result['data_type'] == 'dedup' else 'original'} data:")
+        print(result['status'])
+        if 'error' in result:
+            print(f"Error evaluating {result['model']}: {result['error']}")
+            continue
+        print(f"Accuracy of {result['model']}: {result['accuracy']:.2%}")
+        print(f"Classification Report for {result['model']}:\n{result['report']}")
+        print(f"Confusion Matrix for {result['model']}:\n{np.array(result['confusion_matrix'])}")
+        # Store predictions for error analysis, excluding models that do not require it
+        if result['data_type'] == 'normal' and result['model'] not in BASELINE_MODELS:
+            all_model_predictions[result['model']] = result['predictions']
+
+    # Error analysis: identify difficult sentences (misclassified by most models)
     print("\nTop difficult sentences misclassified by most models:")
-    # Adjust the number as needed
-    for i, (sentence, info) in enumerate(difficult_sentences[:5]):
-        print(f"{i+1}. Sentence: '{sentence}'")
+    difficult = difficult_sentences(all_model_predictions, test_sentences, test_label)
+    for i, info in enumerate(difficult):
+        print(f"{i+1}. Sentence: '{info['sentence']}'")
         print(f"   True label: {info['true_label']}")
         print(f"   Misclassified by: {', '.join(info['misclassified_by'])}\n")
 
-    # Now, evaluate models trained on deduplicated data for system comparison
-    print("\nEvaluating models with deduplicated data:")
-    # Initialize models with deduplicated data and specify data_type='dedup'
-    dtm_dedup = DecisionTreeModel(dedup_train_data_bow, unique_train_labels, data_type='dedup')
-    lrm_dedup = LogisticRegressionModel(dedup_train_data_bow, unique_train_labels, data_type='dedup')
-    ffnn_dedup = FeedForwardNNModel(dedup_train_data_bow, unique_train_labels, data_type='dedup')
-
-    models_dedup = [dtm_dedup, lrm_dedup, ffnn_dedup]
-
-    # Handle training and weight saving/loading for deduplicated data models
-    for model in models_dedup:
-        print(f"\nEvaluating {model.name} with deduplicated data:")
-        if hasattr(model, 'weights_path') and os.path.exists(model.weights_path):
-            # Load existing weights
-            model.load_weights()
-            print(f"Loaded weights for {model.name}")
-        else:
-            # Train the model and save weights
-            if hasattr(model, 'train'):
-                print(f"Training {model.name}")
-                model.train()
-                if hasattr(model, 'save_weights'):
-                    # Ensure the directory exists
-                    weights_dir = os.path.dirname(model.weights_path)
-                    if not os.path.exists(weights_dir):
-                        os.makedirs(weights_dir)
-                    model.save_weights()
-                    print(f"Saved weights for {model.name}")
-        # Evaluate the model
-        try:
-            predictions, accuracy, report, cm = evaluate_model(
-                model, test_sentences, test_label, label_set
-            )
-            # Optionally, store these predictions if needed for further analysis
-        except ValueError as ve:
-            print(f"Error evaluating {model.name}: {ve}")
+    # Machine-readable results so runs can be compared
+    for result in results:
+        result.pop('predictions', None)
+        result.pop('report', None)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({
+            'total_seconds': total_seconds,
+            'workers': args.workers,
+            'models': results,
+            'difficult_sentences': difficult,
+        }, file, indent=2)
+    print(f"Results written to {args.output} ({total_seconds:.1f}s)")
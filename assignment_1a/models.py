@@ -3,27 +3,30 @@
 from sklearn.base import BaseEstimator
 from joblib import dump, load
 import numpy as np
-from keras.utils import to_categorical
-from keras.layers import Dense
-from keras.models import Sequential
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
-from assignment_1a.read_data import (
-    train_data_bow, train_label, dedup_train_data_bow, unique_train_labels,
-    train_sentences, test_sentences, vectorizer, OOV_INDEX, handle_oov
-)
+from sklearn.preprocessing import LabelEncoder
+from assignment_1a.read_data import load_vectorizer, record_vocabulary
 import re
 from collections import Counter
+from itertools import islice
+from bisect import bisect_right
 from abc import ABC, abstractmethod
 import warnings
 import os
 
-# Suppress TensorFlow warnings
+# Suppress TensorFlow warnings (TensorFlow itself is only imported by FeedForwardNNModel)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 warnings.filterwarnings('ignore')
 
+# Number of sentences classified per call when iterating over large inputs
+DEFAULT_CHUNK_SIZE = 4096
+
 class Model(ABC):
-    """All models inherit from this class so we have a uniform way of calling them. Models implement __init__ and a predict function."""
+    """
+    All models inherit from this class so we have a uniform way of calling them. Models implement __init__ and a predict function.
+    predict_batch and predict_proba_batch classify many sentences at once; subclasses override them with a vectorized version.
+    """
 
     @abstractmethod
     def __init__(self, data: list, labels: list):
@@ -35,6 +38,33 @@ class Model(ABC):
     def predict(self, sentence: str) -> str:
         pass
 
+    @property
+    def classes(self) -> list:
+        """The labels this model can predict, in the column order of predict_proba_batch."""
+        return sorted(set(self.labels))
+
+    def hyperparameters(self) -> dict:
+        """Settings that change what training produces; used to fingerprint trained artifacts."""
+        return {}
+
+    def predict_batch(self, sentences: list) -> list:
+        """Predict labels for a batch of sentences."""
+        return [self.predict(sentence) for sentence in sentences]
+
+    def predict_proba_batch(self, sentences: list) -> np.ndarray:
+        """Returns an (n_sentences, n_classes) array of class probabilities, one-hot for models without scores."""
+        column = {label: i for i, label in enumerate(self.classes)}
+        predictions = self.predict_batch(sentences)
+        probabilities = np.zeros((len(predictions), len(column)))
+        probabilities[np.arange(len(predictions)), [column[label] for label in predictions]] = 1.0
+        return probabilities
+
+    def predict_iter(self, sentences, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Lazily predicts labels for any iterable of sentences, calling predict_batch on one chunk at a time."""
+        iterator = iter(sentences)
+        while chunk := list(islice(iterator, chunk_size)):
+            yield from self.predict_batch(chunk)
+
 class RuleBasedModel(Model):
     """Classifies sentences based on keyword matching for each dialog act."""
 
@@ -59,16 +89,52 @@ class RuleBasedModel(Model):
             "null": ["noise", "unintelligible", "cough", "silence", "static", "um", "code", "unclear", "not clear", "no response", "empty", "background noise", "pause", "inaudible", "background sound"],
         }
 
+        self.dialog_acts = list(self.rules)
+        self.matcher = self.compile_rules(self.rules)
+
+    @staticmethod
+    def compile_rules(rules: dict) -> re.Pattern:
+        """
+        Compiles the rule table into one regex with a named group per dialog act.
+        The groups sit inside a lookahead, so finditer reports a match at every position
+        where a keyword starts; at each position the first (highest priority) act wins.
+        """
+        groups = [
+            f"(?P<act{i}>" + "|".join(re.escape(keyword) + r'\b' for keyword in keywords) + ")"
+            for i, keywords in enumerate(rules.values())
+        ]
+        # Every keyword must start at a word boundary, so that check is shared by all alternatives
+        return re.compile(r"\b(?=" + "|".join(groups) + ")", re.IGNORECASE)
+
+    def _act_index(self, match: re.Match) -> int:
+        return int(match.lastgroup[3:])
+
     def predict(self, sentence: str) -> str:
         """Predict the dialog act based on the presence of keywords, ensuring word boundaries."""
-        # Check each dialog act with word boundaries
-        for dialog_act, keywords in self.rules.items():
-            for keyword in keywords:
-                if re.search(r'\b' + re.escape(keyword) + r'\b', sentence, re.IGNORECASE):
-                    return dialog_act
+        # The earliest dialog act with any matching keyword wins, as if checking each act in order
+        best = len(self.dialog_acts)
+        for match in self.matcher.finditer(sentence):
+            best = min(best, self._act_index(match))
+            if best == 0:
+                break
+        if best < len(self.dialog_acts):
+            return self.dialog_acts[best]
 
         return "inform"  # Fallback to "inform" if no keywords match
 
+    def predict_batch(self, sentences: list) -> list:
+        """Runs the matcher once over all sentences joined by newlines, which no keyword can span."""
+        starts = []
+        offset = 0
+        for sentence in sentences:
+            starts.append(offset)
+            offset += len(sentence) + 1
+        best = [len(self.dialog_acts)] * len(sentences)
+        for match in self.matcher.finditer("\n".join(sentences)):
+            i = bisect_right(starts, match.start()) - 1
+            best[i] = min(best[i], self._act_index(match))
+        return [self.dialog_acts[b] if b < len(self.dialog_acts) else "inform" for b in best]
+
 class MajorityClassModel(Model):
     """Calculates the majority class upon initialization and always predicts this class when predicting."""
 
@@ -81,14 +147,19 @@ class MajorityClassModel(Model):
     def predict(self, sentence: str):
         return self.majority_class
 
+    def predict_batch(self, sentences: list) -> list:
+        return [self.majority_class] * len(sentences)
+
 class ScikitModel(Model):
     """Base class for models using scikit-learn classifiers."""
 
-    def __init__(self, data, labels, model: BaseEstimator, name: str, data_type='normal'):
+    def __init__(self, data, labels, model: BaseEstimator, name: str, data_type='normal', vectorizer=None):
         super().__init__(data, labels)
         self.name = name
         self.model = model
         self.data_type = data_type  # Add this attribute
+        # Falls back to the prebuilt vectorizer on disk, so serving never refits it
+        self.vectorizer = vectorizer if vectorizer is not None else load_vectorizer()
         # Adjust weights_path to include data_type
         self.weights_path = os.path.join(
             ".", "assignment_1a", "model_weights",
@@ -98,109 +169,245 @@ class ScikitModel(Model):
     def train(self):
         self.model.fit(self.data, self.labels)
 
+    def hyperparameters(self) -> dict:
+        return {'estimator': type(self.model).__name__, **self.model.get_params()}
+
     def save_weights(self, path=None):
         if path is None:
             path = self.weights_path
         print(f"Saving weights to {path}")
         dump(self.model, path)
+        record_vocabulary(path, self.vectorizer)
 
-    def load_weights(self, path=None):
+    def load_weights(self, path=None, mmap_mode=None):
+        """With mmap_mode='r' the estimator's arrays are memory-mapped, so processes loading the same file share pages."""
         if path is None:
             path = self.weights_path
         print(f"Loading weights from {path}")
-        #self.model = load(path)
-        self.model = load( os.path.join("./assignment_1a/model_weights/decision_tree_model_normal.joblib"))
+        self.model = load(path, mmap_mode=mmap_mode)
 
     def predict(self, sentence: str) -> str:
         # Convert the raw sentence to a bag-of-words feature vector
-        sentence_bow = vectorizer.transform([sentence])
+        sentence_bow = self.vectorizer.transform([sentence])
         # Predict the label using the model
         return self.model.predict(sentence_bow)[0]
 
+    @property
+    def classes(self) -> list:
+        return list(self.model.classes_)
+
+    def predict_batch(self, sentences: list) -> list:
+        """Predict labels for a batch of sentences with one sparse transform and one predict call."""
+        sentence_bow = self.vectorizer.transform(sentences)
+        return self.model.predict(sentence_bow).tolist()
+
+    def predict_proba_batch(self, sentences: list) -> np.ndarray:
+        sentence_bow = self.vectorizer.transform(sentences)
+        return self.model.predict_proba(sentence_bow)
+
 class DecisionTreeModel(ScikitModel):
     """Decision Tree classifier based on bag-of-words features."""
 
-    def __init__(self, data, labels, data_type='normal'):
-        super().__init__(data, labels, model=DecisionTreeClassifier(), name="Decision Tree model", data_type=data_type)
+    def __init__(self, data=None, labels=None, data_type='normal', vectorizer=None, **params):
+        super().__init__(data, labels, model=DecisionTreeClassifier(**params), name="Decision Tree model", data_type=data_type, vectorizer=vectorizer)
 
 class LogisticRegressionModel(ScikitModel):
     """Logistic Regression classifier based on bag-of-words features."""
 
-    def __init__(self, data, labels, data_type='normal'):
-        super().__init__(data, labels, model=LogisticRegression(max_iter=200), name="Logistic Regression model", data_type=data_type)
+    def __init__(self, data=None, labels=None, data_type='normal', vectorizer=None, **params):
+        params = {'max_iter': 200, **params}
+        super().__init__(data, labels, model=LogisticRegression(**params), name="Logistic Regression model", data_type=data_type, vectorizer=vectorizer)
 
 class FeedForwardNNModel(Model):
     """Feed Forward Neural Network classifier based on bag-of-words features using Keras."""
 
-    def __init__(self, data, labels, data_type='normal'):
+    def __init__(self, data=None, labels=None, data_type='normal', vectorizer=None, hidden_units=100, epochs=10):
+        # Keras is imported here so that the other models can be used without loading TensorFlow
+        from keras.utils import to_categorical
+
         super().__init__(data, labels)
         self.name = "Feed Forward NN model"
         self.data_type = data_type 
+        self.hidden_units = hidden_units
+        self.epochs = epochs
+        self.vectorizer = vectorizer if vectorizer is not None else load_vectorizer()
+
+        # Adjust weights_path to include data_type
+        self.weights_path = os.path.join(
+            ".", "assignment_1a", "model_weights",
+            f"{self.name.lower().replace(' ', '_')}_{self.data_type}.weights.h5"
+        )
 
-        self.num_classes = len(sorted(set(labels)))
+        self.input_dim = data.shape[1] if data is not None else len(self.vectorizer.vocabulary_)
+
+        # The label encoder is fitted once from the training labels. A model that is only used for serving
+        # has no labels; load_weights reads the encoder saved next to the weights it loads and builds the
+        # network then, since the output layer has one unit per class.
+        self.label_encoder = None
+        self.model = None
+        if labels is not None:
+            self.label_encoder = LabelEncoder().fit(labels)
+            self.build_network()
+            # Convert labels to categorical
+            self.labels_categorical = to_categorical(
+                self.label_encoder.transform(labels), num_classes=self.num_classes)
+
+    def build_network(self):
+        from keras.layers import Dense
+        from keras.models import Sequential
+
+        self.num_classes = len(self.label_encoder.classes_)
         self.model = Sequential([
-            Dense(100, activation='relu', input_shape=(data.shape[1],)),
+            Dense(self.hidden_units, activation='relu', input_shape=(self.input_dim,)),
             Dense(self.num_classes, activation='softmax')
         ])
         self.model.compile(
             optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy']
         )
-        
-        # Adjust weights_path to include data_type
-        self.weights_path = os.path.join(
-            ".", "assignment_1a", "model_weights",
-            f"{self.name.lower().replace(' ', '_')}_{self.data_type}.weights.h5"
+
+    def labels_path(self, weights_path=None):
+        """The label encoder is stored next to the weights file it belongs to."""
+        if weights_path is None:
+            weights_path = self.weights_path
+        return weights_path.replace(".weights.h5", ".labels.joblib")
+
+    def numpy_path(self, weights_path=None):
+        """The NumPy export used by NumpyFeedForwardNNModel is stored next to the weights file."""
+        if weights_path is None:
+            weights_path = self.weights_path
+        return weights_path.replace(".weights.h5", ".npz")
+
+    def export_numpy(self, path=None):
+        """Dumps the Dense layer weights and class labels so the network can be served without Keras."""
+        if path is None:
+            path = self.numpy_path()
+        hidden, output = self.model.layers
+        hidden_kernel, hidden_bias = hidden.get_weights()
+        output_kernel, output_bias = output.get_weights()
+        np.savez(
+            path, hidden_kernel=hidden_kernel, hidden_bias=hidden_bias,
+            output_kernel=output_kernel, output_bias=output_bias, classes=self.label_encoder.classes_
         )
-        # Convert labels to categorical
-        self.labels_categorical = to_categorical([self.label_to_index(
-            label) for label in labels], num_classes=self.num_classes)
+        record_vocabulary(path, self.vectorizer)
+        print(f"Exported NumPy weights to {path}")
+
+    @property
+    def classes(self) -> list:
+        return self.label_encoder.classes_.tolist()
+
+    def hyperparameters(self) -> dict:
+        return {'hidden_units': self.hidden_units, 'epochs': self.epochs, 'optimizer': 'adam'}
 
     def train(self):
         self.model.fit(self.data, self.labels_categorical,
-                       epochs=10, verbose=0)
+                       epochs=self.epochs, verbose=0)
 
     def save_weights(self, path=None):
         if path is None:
             path = self.weights_path
         print(f"Saving weights to {path}")
         self.model.save_weights(path)
+        dump(self.label_encoder, self.labels_path(path))
+        record_vocabulary(path, self.vectorizer)
+        self.export_numpy(self.numpy_path(path))
 
     def load_weights(self, path=None):
         if path is None:
             path = self.weights_path
         print(f"Loading weights from {path}")
+        labels_path = self.labels_path(path)
+        if self.label_encoder is None or os.path.exists(labels_path):
+            self.label_encoder = load(labels_path)
+        if self.model is None:
+            self.build_network()
         self.model.load_weights(path)
 
     def label_to_index(self, label):
-        return list(sorted(set(self.labels))).index(label)
+        return int(np.searchsorted(self.label_encoder.classes_, label))
 
     def index_to_label(self, index):
-        return list(sorted(set(self.labels)))[index]
+        return str(self.label_encoder.classes_[index])
 
     def predict(self, sentence: str):
         # Convert the raw sentence to a bag-of-words feature vector and handle OOV
-        sentence_bow = vectorizer.transform([sentence])
+        sentence_bow = self.vectorizer.transform([sentence])
         prediction = self.model.predict(sentence_bow.toarray(), verbose=0)[0]  # Suppress output here
         return self.index_to_label(np.argmax(prediction))
 
     def predict_batch(self, sentences: list):
         """Predict labels for a batch of sentences."""
-        sentence_bow = vectorizer.transform(sentences)
+        sentence_bow = self.vectorizer.transform(sentences)
         predictions = self.model.predict(sentence_bow.toarray(), verbose=0)
         predicted_indices = np.argmax(predictions, axis=1)
-        return [self.index_to_label(idx) for idx in predicted_indices]
+        return self.label_encoder.classes_[predicted_indices].tolist()
+
+    def predict_proba_batch(self, sentences: list) -> np.ndarray:
+        sentence_bow = self.vectorizer.transform(sentences)
+        return self.model.predict(sentence_bow.toarray(), verbose=0)
+
+class NumpyFeedForwardNNModel(Model):
+    """
+    Serves a trained FeedForwardNNModel from its NumPy export without importing TensorFlow.
+    The forward pass multiplies the sparse bag-of-words matrix directly, without densifying it.
+    """
+
+    def __init__(self, data=None, labels=None, data_type='normal', vectorizer=None):
+        super().__init__(data, labels)
+        self.name = "Feed Forward NN model"
+        self.data_type = data_type
+        self.vectorizer = vectorizer if vectorizer is not None else load_vectorizer()
+        self.weights_path = os.path.join(
+            ".", "assignment_1a", "model_weights",
+            f"{self.name.lower().replace(' ', '_')}_{self.data_type}.npz"
+        )
+
+    def load_weights(self, path=None):
+        if path is None:
+            path = self.weights_path
+        print(f"Loading weights from {path}")
+        with np.load(path) as weights:
+            self.hidden_kernel = weights['hidden_kernel']
+            self.hidden_bias = weights['hidden_bias']
+            self.output_kernel = weights['output_kernel']
+            self.output_bias = weights['output_bias']
+            self.label_classes = weights['classes']
+
+    @property
+    def classes(self) -> list:
+        return self.label_classes.tolist()
+
+    def forward(self, sentence_bow) -> np.ndarray:
+        """Dense(relu) followed by Dense(softmax) on a CSR matrix of bag-of-words counts."""
+        hidden = np.maximum(sentence_bow @ self.hidden_kernel + self.hidden_bias, 0)
+        logits = hidden @ self.output_kernel + self.output_bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, sentence: str) -> str:
+        return self.predict_batch([sentence])[0]
+
+    def predict_batch(self, sentences: list) -> list:
+        probabilities = self.predict_proba_batch(sentences)
+        return self.label_classes[np.argmax(probabilities, axis=1)].tolist()
+
+    def predict_proba_batch(self, sentences: list) -> np.ndarray:
+        sentence_bow = self.vectorizer.transform(sentences).astype(self.hidden_kernel.dtype)
+        return self.forward(sentence_bow)
 
 if __name__ == "__main__":
+    from assignment_1a.read_data import corpus
+
     # Initialize the models with training data
     # Majority Class Model
-    mcm = MajorityClassModel(train_sentences, train_label)
-    rbm = RuleBasedModel(train_sentences, train_label)  # Rule-Based Model
+    mcm = MajorityClassModel(corpus.train_sentences, corpus.train_label)
+    rbm = RuleBasedModel(corpus.train_sentences, corpus.train_label)  # Rule-Based Model
 
-    dtm = DecisionTreeModel(train_data_bow, train_label)  # Decision Tree Model
+    dtm = DecisionTreeModel(corpus.train_data_bow, corpus.train_label, vectorizer=corpus.vectorizer)  # Decision Tree Model
     # Logistic Regression Model
-    lrm = LogisticRegressionModel(train_data_bow, train_label)
+    lrm = LogisticRegressionModel(corpus.train_data_bow, corpus.train_label, vectorizer=corpus.vectorizer)
     # Feed Forward NN Model
-    ffnn = FeedForwardNNModel(train_data_bow, train_label)
+    ffnn = FeedForwardNNModel(corpus.train_data_bow, corpus.train_label, vectorizer=corpus.vectorizer)
 
     # Add more models here so they get evaluated
     models = [mcm, rbm, dtm, lrm, ffnn]
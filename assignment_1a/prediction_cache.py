@@ -0,0 +1,103 @@
+# prediction_cache.py
+# A bounded LRU cache in front of any Model. User turns repeat a lot ("yes", "no", "thank you goodbye"),
+# so most dialogue act predictions can be answered without running the classifier.
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from assignment_1a.models import Model
+from assignment_1a.read_data import read_dialog_acts, data_path
+
+
+class CachedModel(Model):
+    """
+    Wraps a model with an LRU cache keyed by the normalized sentence (lowercased, whitespace collapsed).
+    One instance can be shared by all sessions; lookups are thread-safe.
+    """
+
+    def __init__(self, model: Model, maxsize: int = 4096):
+        self.model = model
+        self.name = model.name
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    @staticmethod
+    def normalize(sentence: str) -> str:
+        return " ".join(sentence.lower().split())
+
+    @property
+    def classes(self) -> list:
+        return self.model.classes
+
+    def _lookup(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _store(self, key, label):
+        with self._lock:
+            self._cache[key] = label
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def _count(self, hits: int, misses: int, hit_seconds=0.0, miss_seconds=0.0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.hit_seconds += hit_seconds
+            self.miss_seconds += miss_seconds
+
+    def predict(self, sentence: str) -> str:
+        start = time.perf_counter()
+        key = self.normalize(sentence)
+        label = self._lookup(key)
+        if label is not None:
+            self._count(1, 0, hit_seconds=time.perf_counter() - start)
+            return label
+        label = self.model.predict(key)
+        self._store(key, label)
+        self._count(0, 1, miss_seconds=time.perf_counter() - start)
+        return label
+
+    def predict_batch(self, sentences: list) -> list:
+        """Answers cached sentences directly and classifies the remaining ones in one batch."""
+        keys = [self.normalize(sentence) for sentence in sentences]
+        labels = [self._lookup(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, label in zip(keys, labels) if label is None))
+        predicted = dict(zip(missing, self.model.predict_batch(missing))) if missing else {}
+        for key, label in predicted.items():
+            self._store(key, label)
+        self._count(sum(label is not None for label in labels), sum(label is None for label in labels))
+        return [label if label is not None else predicted[key] for key, label in zip(keys, labels)]
+
+    def warm(self, sentences, top: int = None):
+        """Pre-fills the cache with the most frequent of the given sentences."""
+        counts = Counter(self.normalize(sentence) for sentence in sentences)
+        most_common = [key for key, _ in counts.most_common(min(top or self.maxsize, self.maxsize))]
+        # Insert the most frequent last so they are the last to be evicted
+        for key, label in reversed(list(zip(most_common, self.model.predict_batch(most_common)))):
+            self._store(key, label)
+
+    def warm_from_dialog_acts(self, top: int = None, path=data_path):
+        """Pre-fills the cache with the most frequent sentences in dialog_acts.dat."""
+        _, sentences = read_dialog_acts(path)
+        self.warm(sentences, top)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'mean_hit_ms': 1000 * self.hit_seconds / self.hits if self.hits else 0.0,
+            'mean_miss_ms': 1000 * self.miss_seconds / self.misses if self.misses else 0.0,
+        }
@@ -1,8 +1,16 @@
 import os
+import json
+import hashlib
+from functools import cached_property, lru_cache
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.model_selection import train_test_split
 from collections import Counter
-from joblib import dump
+from joblib import dump, load
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; manifest writes are then not locked
+    fcntl = None
 
 # Get the directory of the current file (read_data.py)
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,67 +18,218 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 # Construct the path to the data file
 data_path = os.path.join(current_dir, "data", "dialog_acts.dat")
 
-labels = []
-sentences = []
-
-# Read the file and split each line into label and sentence
-with open(data_path, encoding='utf-8') as file:
-    for line_number, line in enumerate(file, start=1):
-        parts = line.strip().split(maxsplit=1)
-        if len(parts) == 2:
-            label, sentence = parts
-            labels.append(label)
-            sentences.append(sentence.strip())
-        else:
-            print(f"Skipping malformed line {line_number}: {line.strip()}")
-
-# Split the original dataset into 85% training and 15% test data (unvectorized sentences)
-train_sentences, test_sentences, train_label, test_label = train_test_split(
-    sentences, labels, test_size=0.15, random_state=42, stratify=labels)
-
-# Deduplicate the training dataset while ensuring at least one sentence per label
-unique_train_sentences = []
-unique_train_labels = []
-seen_train = set()
-
-# Step 1: Retain one unique sentence per label
-labels_seen = set()
-for sentence, label in zip(train_sentences, train_label):
-    if label not in labels_seen and sentence not in seen_train:
-        unique_train_sentences.append(sentence)
-        unique_train_labels.append(label)
-        seen_train.add(sentence)
-        labels_seen.add(label)
-
-# Step 2: Deduplicate the remaining data
-for sentence, label in zip(train_sentences, train_label):
-    if sentence not in seen_train:
-        unique_train_sentences.append(sentence)
-        unique_train_labels.append(label)
-        seen_train.add(sentence)
-
-# Verification: Ensure all labels are retained
-missing_labels = set(train_label) - set(unique_train_labels)
-if missing_labels:
-    print(f"Warning: The following labels are missing in deduplicated training data: {missing_labels}")
-    # Optionally, handle missing labels by adding dummy sentences or adjusting deduplication logic
-else:
-    print("All labels are present in deduplicated training data.")
-
-# Create bag-of-words vectorizer based on the original training sentences
-vectorizer = CountVectorizer()
-vectorizer.fit(train_sentences)
-
-# Save the fitted vectorizer to disk
-vectorizer_path = os.path.join(current_dir, "model_weights", "vectorizer.joblib")
-dump(vectorizer, vectorizer_path)
-print(f"Vectorizer saved to {vectorizer_path}")
-
-# Create bag-of-words embeddings for the original training data
-train_data_bow = vectorizer.transform(train_sentences)
-
-# Create bag-of-words embeddings for the deduplicated training data
-dedup_train_data_bow = vectorizer.transform(unique_train_sentences)
+# Location of the prebuilt vectorizer and model artifacts used when serving
+weights_dir = os.path.join(current_dir, "model_weights")
+vectorizer_path = os.path.join(weights_dir, "vectorizer.joblib")
+
+# Records which vectorizer vocabulary each artifact in weights_dir was trained with
+manifest_path = os.path.join(weights_dir, "manifest.json")
+
+
+def read_dialog_acts(path=data_path):
+    """Reads the file and splits each line into label and sentence."""
+    labels = []
+    sentences = []
+    with open(path, encoding='utf-8') as file:
+        for line_number, line in enumerate(file, start=1):
+            parts = line.strip().split(maxsplit=1)
+            if len(parts) == 2:
+                label, sentence = parts
+                labels.append(label)
+                sentences.append(sentence.strip())
+            else:
+                print(f"Skipping malformed line {line_number}: {line.strip()}")
+    return labels, sentences
+
+
+def deduplicate(sentences, labels):
+    """Deduplicates a dataset while ensuring at least one sentence per label."""
+    unique_sentences = []
+    unique_labels = []
+    seen = set()
+
+    # Step 1: Retain one unique sentence per label
+    labels_seen = set()
+    for sentence, label in zip(sentences, labels):
+        if label not in labels_seen and sentence not in seen:
+            unique_sentences.append(sentence)
+            unique_labels.append(label)
+            seen.add(sentence)
+            labels_seen.add(label)
+
+    # Step 2: Deduplicate the remaining data
+    for sentence, label in zip(sentences, labels):
+        if sentence not in seen:
+            unique_sentences.append(sentence)
+            unique_labels.append(label)
+            seen.add(sentence)
+
+    # Verification: Ensure all labels are retained
+    missing_labels = set(labels) - set(unique_labels)
+    if missing_labels:
+        print(f"Warning: The following labels are missing in deduplicated training data: {missing_labels}")
+    else:
+        print("All labels are present in deduplicated training data.")
+
+    return unique_sentences, unique_labels
+
+
+class DialogActCorpus:
+    """
+    The dialog act dataset with its train/test split, deduplicated training set
+    and bag-of-words matrices. Every part is computed on first access and cached,
+    so creating a corpus (or importing this module) does not read, fit or write anything.
+    """
+
+    def __init__(self, path=data_path, test_size=0.15, random_state=42, vectorizer_params=None):
+        self.path = path
+        self.test_size = test_size
+        self.random_state = random_state
+        self.vectorizer_params = vectorizer_params or {}
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Identifies everything the bag-of-words data depends on: file contents, split and vectorizer settings."""
+        settings = {
+            'data': file_digest(self.path),
+            'test_size': self.test_size,
+            'random_state': self.random_state,
+            'vectorizer': CountVectorizer(**self.vectorizer_params).get_params(),
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    @cached_property
+    def _raw(self):
+        return read_dialog_acts(self.path)
+
+    @property
+    def labels(self):
+        return self._raw[0]
+
+    @property
+    def sentences(self):
+        return self._raw[1]
+
+    @cached_property
+    def _split(self):
+        # Split the original dataset into 85% training and 15% test data (unvectorized sentences)
+        return train_test_split(
+            self.sentences, self.labels, test_size=self.test_size,
+            random_state=self.random_state, stratify=self.labels)
+
+    @property
+    def train_sentences(self):
+        return self._split[0]
+
+    @property
+    def test_sentences(self):
+        return self._split[1]
+
+    @property
+    def train_label(self):
+        return self._split[2]
+
+    @property
+    def test_label(self):
+        return self._split[3]
+
+    @cached_property
+    def _dedup(self):
+        return deduplicate(self.train_sentences, self.train_label)
+
+    @property
+    def unique_train_sentences(self):
+        return self._dedup[0]
+
+    @property
+    def unique_train_labels(self):
+        return self._dedup[1]
+
+    @cached_property
+    def vectorizer(self):
+        # Create bag-of-words vectorizer based on the original training sentences
+        vectorizer = CountVectorizer(**self.vectorizer_params)
+        vectorizer.fit(self.train_sentences)
+        return vectorizer
+
+    @cached_property
+    def train_data_bow(self):
+        # Bag-of-words embeddings for the original training data
+        return self.vectorizer.transform(self.train_sentences)
+
+    @cached_property
+    def dedup_train_data_bow(self):
+        # Bag-of-words embeddings for the deduplicated training data
+        return self.vectorizer.transform(self.unique_train_sentences)
+
+    def build(self):
+        """Computes every cached part now, e.g. before forking worker processes that should share it."""
+        self.train_data_bow, self.dedup_train_data_bow, self.test_label
+        return self
+
+    def save_vectorizer(self, path=vectorizer_path):
+        """Saves the fitted vectorizer so serving processes can load it instead of refitting."""
+        dump(self.vectorizer, path)
+        load_vectorizer.cache_clear()
+        print(f"Vectorizer saved to {path}")
+
+
+@lru_cache(maxsize=None)
+def load_vectorizer(path=vectorizer_path) -> CountVectorizer:
+    """Loads the prebuilt vectorizer from disk, once per process."""
+    return load(path)
+
+
+def vocabulary_hash(vectorizer: CountVectorizer) -> str:
+    """A fingerprint of the vocabulary and its feature order; models only work with the vocabulary they were trained on."""
+    terms = sorted(vectorizer.vocabulary_.items(), key=lambda item: item[1])
+    return hashlib.sha256("\n".join(term for term, _ in terms).encode('utf-8')).hexdigest()
+
+
+def manifest_for(artifact_path) -> str:
+    """Each artifact directory keeps its own manifest, e.g. weights_dir and the training cache."""
+    return os.path.join(os.path.dirname(os.path.abspath(artifact_path)), "manifest.json")
+
+
+def read_manifest(path=manifest_path) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def record_vocabulary(artifact_path, vectorizer: CountVectorizer):
+    """Stores the vocabulary hash for an artifact in the manifest of its directory."""
+    path = manifest_for(artifact_path)
+    # Several training processes may save at once, so updates are serialized with a lock
+    # and the manifest is replaced atomically
+    with open(path + ".lock", 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        manifest = read_manifest(path)
+        manifest[os.path.basename(artifact_path)] = {'vocabulary_hash': vocabulary_hash(vectorizer)}
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, path)
+
+
+def recorded_vocabulary(artifact_path):
+    """The vocabulary hash stored for an artifact, or None if it was never recorded."""
+    return read_manifest(manifest_for(artifact_path)).get(os.path.basename(artifact_path), {}).get('vocabulary_hash')
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Default corpus; nothing is computed until one of its attributes is used
+corpus = DialogActCorpus()
 
 # Special integer for out-of-vocabulary (OOV) words
 OOV_INDEX = 0
@@ -87,27 +246,41 @@ def handle_oov(sentence, vectorizer, oov_index=OOV_INDEX):
             indices.append(oov_index)
     return indices
 
+_CORPUS_ATTRIBUTES = {
+    'train_data_bow', 'train_label', 'dedup_train_data_bow', 'unique_train_labels',
+    'unique_train_sentences', 'train_sentences', 'test_sentences', 'test_label',
+    'vectorizer', 'labels', 'sentences'
+}
+
+
+def __getattr__(name):
+    # Keeps `from assignment_1a.read_data import train_data_bow` working, computed on demand
+    if name in _CORPUS_ATTRIBUTES:
+        return getattr(corpus, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Export the variables needed for model training and evaluation
 __all__ = [
-    'train_data_bow', 'train_label', 'dedup_train_data_bow', 'unique_train_labels',
-    'train_sentences', 'test_sentences', 'test_label',  # Removed duplicate 'train_label'
-    'vectorizer', 'OOV_INDEX', 'handle_oov'
+    'DialogActCorpus', 'corpus', 'read_dialog_acts', 'deduplicate', 'load_vectorizer',
+    'vocabulary_hash', 'record_vocabulary', 'recorded_vocabulary', 'file_digest',
+    'data_path', 'weights_dir', 'vectorizer_path', 'manifest_path', 'OOV_INDEX', 'handle_oov'
 ]
 
 if __name__ == "__main__":
     # Print out the first few entries for debugging purposes
-    print(f"Original Sentences: {len(train_label)} training, {len(test_label)} testing")
-    print(f"Deduplicated Sentences: {len(unique_train_labels)} training")
-    print(f"Vectorized Original Training Data (first 10 rows):\n{train_data_bow[:10].toarray()}")
-    print(f"Vectorized Deduplicated Training Data (first 10 rows):\n{dedup_train_data_bow[:10].toarray()}")
+    print(f"Original Sentences: {len(corpus.train_label)} training, {len(corpus.test_label)} testing")
+    print(f"Deduplicated Sentences: {len(corpus.unique_train_labels)} training")
+    print(f"Vectorized Original Training Data (first 10 rows):\n{corpus.train_data_bow[:10].toarray()}")
+    print(f"Vectorized Deduplicated Training Data (first 10 rows):\n{corpus.dedup_train_data_bow[:10].toarray()}")
 
     # Additional Debugging: Check if all labels are present
     print("\nLabel Distribution in Original Training Data:")
-    original_label_counts = Counter(train_label)
+    original_label_counts = Counter(corpus.train_label)
     for label, count in original_label_counts.items():
         print(f"  {label}: {count}")
 
     print("\nLabel Distribution in Deduplicated Training Data:")
-    dedup_label_counts = Counter(unique_train_labels)
+    dedup_label_counts = Counter(corpus.unique_train_labels)
     for label, count in dedup_label_counts.items():
         print(f"  {label}: {count}")
@@ -0,0 +1,92 @@
+# registry.py
+# Maps a model name and data type ('normal' or 'dedup') to its trained artifact,
+# checks that the artifact matches the prebuilt vectorizer and caches loaded models per process.
+
+import os
+import json
+from functools import lru_cache
+from assignment_1a.read_data import weights_dir, load_vectorizer, vocabulary_hash, recorded_vocabulary
+from assignment_1a.models import (
+    Model, ScikitModel, DecisionTreeModel, LogisticRegressionModel, FeedForwardNNModel, NumpyFeedForwardNNModel
+)
+
+# Model name -> (model class, artifact file name)
+MODELS = {
+    'decision_tree': (DecisionTreeModel, "decision_tree_model_{data_type}.joblib"),
+    'logistic_regression': (LogisticRegressionModel, "logistic_regression_model_{data_type}.joblib"),
+    'feed_forward_nn': (FeedForwardNNModel, "feed_forward_nn_model_{data_type}.weights.h5"),
+    'feed_forward_nn_numpy': (NumpyFeedForwardNNModel, "feed_forward_nn_model_{data_type}.npz"),
+}
+
+DATA_TYPES = ('normal', 'dedup')
+
+# Which model main.py serves and the hyperparameters each model is trained with.
+# Written by `python -m assignment_1a.search --emit`; without it the decision tree is served with defaults.
+serving_config_path = os.path.join(weights_dir, "serving.json")
+
+DEFAULT_SERVING_CONFIG = {'model': 'decision_tree', 'data_type': 'normal', 'hyperparameters': {}}
+
+
+def read_serving_config() -> dict:
+    if not os.path.exists(serving_config_path):
+        return dict(DEFAULT_SERVING_CONFIG)
+    with open(serving_config_path, encoding='utf-8') as file:
+        return {**DEFAULT_SERVING_CONFIG, **json.load(file)}
+
+
+def default_hyperparameters(name: str) -> dict:
+    """Hyperparameters from the serving config; the NumPy network shares those of the Keras one."""
+    name = name.removesuffix('_numpy')
+    return dict(read_serving_config()['hyperparameters'].get(name, {}))
+
+
+def artifact_path(name: str, data_type: str = 'normal') -> str:
+    if name not in MODELS:
+        raise ValueError(f"Unknown model {name!r}, expected one of {sorted(MODELS)}")
+    if data_type not in DATA_TYPES:
+        raise ValueError(f"Unknown data type {data_type!r}, expected one of {DATA_TYPES}")
+    return os.path.join(weights_dir, MODELS[name][1].format(data_type=data_type))
+
+
+def validate_artifact(path: str, vectorizer) -> None:
+    """Raises a ValueError unless the artifact was saved with the same vocabulary as the vectorizer."""
+    if not os.path.exists(path):
+        raise ValueError(f"No trained artifact at {path}, train the model first")
+    recorded = recorded_vocabulary(path)
+    if recorded is None:
+        raise ValueError(f"{os.path.basename(path)} has no recorded vocabulary, retrain or re-save it")
+    if recorded != vocabulary_hash(vectorizer):
+        raise ValueError(f"{os.path.basename(path)} was trained with a different vocabulary than the current vectorizer")
+
+
+@lru_cache(maxsize=None)
+def load_model(name: str, data_type: str = 'normal') -> Model:
+    """Loads a trained model once per process; later calls return the same instance."""
+    path = artifact_path(name, data_type)
+    vectorizer = load_vectorizer()
+    validate_artifact(path, vectorizer)
+
+    model_class = MODELS[name][0]
+    if model_class is NumpyFeedForwardNNModel:
+        # The layer sizes are read from the exported weights
+        model = model_class(data_type=data_type, vectorizer=vectorizer)
+    else:
+        model = model_class(data_type=data_type, vectorizer=vectorizer, **default_hyperparameters(name))
+    if isinstance(model, ScikitModel):
+        model.load_weights(path, mmap_mode='r')
+    else:
+        model.load_weights(path)
+    return model
+
+
+def load_serving_model() -> Model:
+    """The model selected in the serving config."""
+    config = read_serving_config()
+    return load_model(config['model'], config['data_type'])
+
+
+if __name__ == "__main__":
+    for name in MODELS:
+        for data_type in DATA_TYPES:
+            model = load_model(name, data_type)
+            print(f"{name} ({data_type}): {model.predict('thank you goodbye')}")
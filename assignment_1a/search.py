@@ -0,0 +1,171 @@
+# search.py
+# k-fold cross-validation over hyperparameter grids for the bag-of-words classifiers.
+# Folds slice the precomputed bag-of-words matrix, so sentences are vectorized once for the whole search.
+# Run from the root directory: python -m assignment_1a.search [--folds 5] [--workers N] [--grid grid.json] [--emit]
+
+from assignment_1a.read_data import corpus
+from assignment_1a.registry import MODELS, serving_config_path, read_serving_config
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold, ParameterGrid
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import statistics
+import time
+import os
+
+# Model name -> parameter grid; override with --grid <json file> in the same shape
+GRIDS = {
+    'decision_tree': {
+        'max_depth': [None, 20, 50],
+        'min_samples_leaf': [1, 2, 5],
+    },
+    'logistic_regression': {
+        'C': [0.1, 1.0, 10.0],
+        'max_iter': [200],
+    },
+    'feed_forward_nn': {
+        'hidden_units': [50, 100],
+        'epochs': [5, 10],
+    },
+}
+
+# Number of held-out sentences timed one at a time for the latency estimate
+LATENCY_SAMPLE = 100
+
+
+def training_set(data_type):
+    if data_type == 'dedup':
+        return corpus.dedup_train_data_bow, np.array(corpus.unique_train_labels), corpus.unique_train_sentences
+    return corpus.train_data_bow, np.array(corpus.train_label), corpus.train_sentences
+
+
+def run_fold(job):
+    """Trains one configuration on one fold and returns its held-out accuracy and single-sentence latency."""
+    name, params, data_type, train_index, test_index = job
+    data, labels, sentences = training_set(data_type)
+    model = MODELS[name][0](
+        data[train_index], labels[train_index].tolist(), data_type=data_type, vectorizer=corpus.vectorizer, **params
+    )
+    model.train()
+
+    held_out = [sentences[i] for i in test_index]
+    predictions = model.predict_batch(held_out)
+    accuracy = float(np.mean(np.array(predictions) == labels[test_index]))
+
+    latencies = []
+    for sentence in held_out[:LATENCY_SAMPLE]:
+        start = time.perf_counter()
+        model.predict(sentence)
+        latencies.append(time.perf_counter() - start)
+    return accuracy, statistics.median(latencies) * 1000
+
+
+def pareto_front(results: list) -> list:
+    """Results that no other result beats on both accuracy and latency, fastest first."""
+    front = [
+        r for r in results
+        if not any(
+            o['accuracy'] >= r['accuracy'] and o['latency_ms'] <= r['latency_ms']
+            and (o['accuracy'] > r['accuracy'] or o['latency_ms'] < r['latency_ms'])
+            for o in results
+        )
+    ]
+    return sorted(front, key=lambda r: r['latency_ms'])
+
+
+def search(grids: dict, folds=5, data_type='normal', workers=None) -> list:
+    """Cross-validates every configuration in the grids; folds of all configurations run in parallel."""
+    corpus.build()
+    _, labels, _ = training_set(data_type)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(np.zeros(len(labels)), labels))
+
+    configurations = [(name, params) for name, grid in grids.items() for params in ParameterGrid(grid)]
+    jobs = [
+        (name, params, data_type, train_index, test_index)
+        for name, params in configurations for train_index, test_index in splits
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        fold_results = list(pool.map(run_fold, jobs))
+
+    results = []
+    for i, (name, params) in enumerate(configurations):
+        scores = fold_results[i * folds:(i + 1) * folds]
+        accuracies = [accuracy for accuracy, _ in scores]
+        results.append({
+            'model': name,
+            'hyperparameters': params,
+            'accuracy': statistics.mean(accuracies),
+            'accuracy_std': statistics.pstdev(accuracies),
+            'latency_ms': statistics.mean(latency for _, latency in scores),
+        })
+    return results
+
+
+def print_results(title: str, results: list):
+    print(f"\n{title}")
+    print(f"{'model':<22}{'accuracy':>10}{'std':>8}{'latency (ms)':>14}  hyperparameters")
+    for r in results:
+        print(f"{r['model']:<22}{r['accuracy']:>10.2%}{r['accuracy_std']:>8.2%}{r['latency_ms']:>14.3f}  {r['hyperparameters']}")
+
+
+def choose(results: list, max_latency_ms=None) -> dict:
+    """The most accurate configuration on the Pareto front within the latency budget."""
+    front = [r for r in pareto_front(results) if max_latency_ms is None or r['latency_ms'] <= max_latency_ms]
+    if not front:
+        raise ValueError(f"No configuration is faster than {max_latency_ms} ms per sentence")
+    return max(front, key=lambda r: (r['accuracy'], -r['latency_ms']))
+
+
+def emit_serving_config(results: list, chosen: dict, data_type: str):
+    """Writes the chosen model and the best hyperparameters of every searched model as the serving default."""
+    config = read_serving_config()
+    config['model'] = chosen['model']
+    config['data_type'] = data_type
+    hyperparameters = dict(config['hyperparameters'])
+    for name in {r['model'] for r in results}:
+        best = max((r for r in results if r['model'] == name), key=lambda r: (r['accuracy'], -r['latency_ms']))
+        hyperparameters[name] = best['hyperparameters']
+    config['hyperparameters'] = hyperparameters
+    with open(serving_config_path, 'w', encoding='utf-8') as file:
+        json.dump(config, file, indent=2, sort_keys=True)
+    print(f"Serving config written to {serving_config_path}; run `python -m assignment_1a.train_models` to train it")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the dialog act classifiers.")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--data-type", choices=['normal', 'dedup'], default='normal')
+    parser.add_argument("--models", nargs='+', choices=sorted(GRIDS), default=sorted(GRIDS))
+    parser.add_argument("--grid", help="JSON file mapping model names to parameter grids")
+    parser.add_argument("--max-latency-ms", type=float, help="only choose configurations at most this slow")
+    parser.add_argument("--output", default=os.path.join("assignment_1a", "search_results.json"))
+    parser.add_argument("--emit", action="store_true", help="write the chosen configuration to the serving config")
+    args = parser.parse_args()
+
+    grids = GRIDS
+    if args.grid:
+        with open(args.grid, encoding='utf-8') as file:
+            grids = json.load(file)
+    grids = {name: grid for name, grid in grids.items() if name in args.models}
+
+    start = time.perf_counter()
+    results = search(grids, folds=args.folds, data_type=args.data_type, workers=args.workers)
+    print_results(f"{args.folds}-fold cross-validation ({time.perf_counter() - start:.1f}s)",
+                  sorted(results, key=lambda r: -r['accuracy']))
+    for name in grids:
+        print_results(f"Pareto front for {name}", pareto_front([r for r in results if r['model'] == name]))
+    front = pareto_front(results)
+    print_results("Pareto front over all models", front)
+
+    chosen = choose(results, args.max_latency_ms)
+    print(f"\nChosen: {chosen['model']} {chosen['hyperparameters']} "
+          f"({chosen['accuracy']:.2%}, {chosen['latency_ms']:.3f} ms per sentence)")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'folds': args.folds, 'data_type': args.data_type, 'results': results,
+                   'pareto_front': front, 'chosen': chosen}, file, indent=2)
+    if args.emit:
+        emit_serving_config(results, chosen, args.data_type)
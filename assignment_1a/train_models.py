@@ -1,14 +1,40 @@
-from models import DecisionTreeModel, LogisticRegressionModel, FeedForwardNNModel
-from read_data import train_label, train_data_bow
+from assignment_1a.models import DecisionTreeModel
+from assignment_1a.read_data import corpus
+from assignment_1a.registry import MODELS, default_hyperparameters, read_serving_config
+from assignment_1a.training_cache import train_or_load
+
+
+def training_data(data_type: str):
+    """The bag-of-words training matrix and labels of a data type."""
+    if data_type == 'dedup':
+        return corpus.dedup_train_data_bow, corpus.unique_train_labels
+    return corpus.train_data_bow, corpus.train_label
+
+
+def train_all():
+    """
+    Trains every bag-of-words model on the training split with the hyperparameters from the serving config,
+    reusing cached weights when nothing changed, and saves them with the vectorizer under the names used for serving.
+    The 'normal' artifacts are always trained, and so are those of the data type the serving config selects,
+    so the served artifact never keeps hyperparameters from before the last search.
+    """
+    corpus.save_vectorizer()
+    for data_type in dict.fromkeys(['normal', read_serving_config()['data_type']]):
+        data, labels = training_data(data_type)
+        for name in ['decision_tree', 'logistic_regression', 'feed_forward_nn']:
+            model_class = MODELS[name][0]
+            model = model_class(data, labels, data_type=data_type, vectorizer=corpus.vectorizer, **default_hyperparameters(name))
+            if train_or_load(corpus, model):
+                print(f'{model.name} ({data_type}) is up to date')
+            else:
+                print(f'Trained {model.name} ({data_type})')
+            model.save_weights()
 
-for model_class in [DecisionTreeModel, LogisticRegressionModel, FeedForwardNNModel]:
-    model = model_class(train_data_bow, train_label)
-    print(f'Training {model.name}...')
-    model.train()
-    model.save_weights()
 
 if __name__ == "__main__":
-    model = DecisionTreeModel(train_data_bow, train_label)
+    train_all()
+
+    model = DecisionTreeModel()
     model.load_weights()
 
     model.predict("Hello can i uhhh")
@@ -0,0 +1,44 @@
+# training_cache.py
+# Content-addressed storage for trained models. The artifact path contains a fingerprint of the
+# dataset contents, split, vectorizer settings, data type and model hyperparameters, so a model
+# is only retrained when one of those changes.
+
+import hashlib
+import json
+import os
+from assignment_1a.read_data import DialogActCorpus, weights_dir
+from assignment_1a.models import Model
+
+cache_dir = os.path.join(weights_dir, "cache")
+
+
+def training_fingerprint(corpus: DialogActCorpus, model: Model) -> str:
+    settings = {
+        'corpus': corpus.fingerprint,
+        'data_type': model.data_type,
+        'model': type(model).__name__,
+        'hyperparameters': model.hyperparameters(),
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def cached_weights_path(corpus: DialogActCorpus, model: Model) -> str:
+    """decision_tree_model_normal.joblib becomes cache/decision_tree_model_normal-<fingerprint>.joblib"""
+    name = os.path.basename(model.weights_path)
+    stem, extension = name.split('.', 1)
+    return os.path.join(cache_dir, f"{stem}-{training_fingerprint(corpus, model)[:16]}.{extension}")
+
+
+def train_or_load(corpus: DialogActCorpus, model: Model) -> bool:
+    """
+    Loads the model from the cache if it was trained on exactly these inputs before,
+    otherwise trains it and stores the result. Returns True on a cache hit.
+    """
+    path = cached_weights_path(corpus, model)
+    if os.path.exists(path):
+        model.load_weights(path)
+        return True
+    os.makedirs(cache_dir, exist_ok=True)
+    model.train()
+    model.save_weights(path)
+    return False
@@ -3,8 +3,12 @@ import assignment_1c.config
 from assignment_1b.transition_manager import TransitionManager, State
 from assignment_1b.extract_preferences import PreferenceExtractor
 from assignment_1a.models import DecisionTreeModel
-from assignment_1b.lookup_restaurant import RestaurantLookup
+from assignment_1b.lookup_restaurant import RestaurantLookup, PREFERENCE_COMBINATIONS
 import random
+from collections import deque
+
+# States the dialogue moves through without waiting for the user
+AUTOMATIC_STATES = ['5. Collect Candidates', '7. Suggest Restaurant', '8. Reply Additional Information', '9. Goodbye']
 
 class DialogueManager:
     def __init__(self, tm: TransitionManager, preference_extractor: PreferenceExtractor, model: DecisionTreeModel, restaurant_lookup: RestaurantLookup):
@@ -14,24 +18,29 @@ class DialogueManager:
         self.restaurant_lookup = restaurant_lookup
         self.suggested_restaurants = set()
         self.first_suggestion = True
+        # Ranked alternatives still to offer, and the preferences and table they were ranked for
+        self.ranking = deque()
+        self.ranking_key = None
 
     def start_conversation(self):
         self.tm.speak()
+        while self.awaiting_input():
+            self.process_input(input("Your answer: ").strip())
+
+    def awaiting_input(self) -> bool:
+        """Runs the states that need no user input; returns whether the conversation now waits for an answer."""
         while not self.tm.dead:
             if self.tm.current_state.terminal:
-                break
-            state_name = self.tm.current_state.name
-            if state_name not in ['5. Collect Candidates', '7. Suggest Restaurant', '8. Reply Additional Information', '9. Goodbye']:
-                user_input = input("Your answer: ").strip()
-            else:
-                user_input = None
-            self.process_input(user_input)
+                return False
+            if self.tm.current_state.name not in AUTOMATIC_STATES:
+                return True
+            self.process_input(None)
+        return False
 
-    def process_input(self, user_input: str):
-        if user_input:
-            dialogue_act = self.model.predict(user_input)
-        else:
-            dialogue_act = ""
+    def process_input(self, user_input: str, dialogue_act: str = None):
+        """Handles one user answer; the dialogue act can be passed in when it was classified elsewhere."""
+        if dialogue_act is None:
+            dialogue_act = self.model.predict(user_input) if user_input else ""
 
         state_name = self.tm.current_state.name
         
@@ -223,7 +232,7 @@ class DialogueManager:
 
     def handle_ask_additional_requirements(self, user_input: str, dialogue_act: str):
         if dialogue_act in ["deny", "negate"]:
-            self.suggest_restaurant(allow_alternatives=False)
+            # The suggestion is made in 7. Suggest Restaurant
             self.tm.set_state("7. Suggest Restaurant")
             self.tm.speak()
         elif dialogue_act in ["affirm", "request", "remove", "confirm", "ack"]:
@@ -266,49 +275,39 @@ class DialogueManager:
         print(f"DEBUG: Current preferences: {self.tm.preferences}")
         print(f"DEBUG: Additional requirements: {self.tm.additional_requirements}")
 
-        preference_combinations = [
-            ['location', 'price_range', 'food_type'],
-            ['location', 'price_range'],
-            ['location', 'food_type'],
-            ['price_range', 'food_type'],
-            ['location'],
-            ['price_range'],
-            ['food_type'],
-            []
-        ]
-
-        for combination in preference_combinations:
-            print(f"DEBUG: Trying preference combination: {combination}")
-            current_preferences = {k: self.tm.preferences[k] for k in combination if k in self.tm.preferences}
-            print(f"DEBUG: Current preferences for this iteration: {current_preferences}")
-
-            candidates = self.restaurant_lookup.get_candidates(current_preferences)
-            print(f"DEBUG: Number of candidates found: {len(candidates)}")
-
-            if not candidates.empty:
-                selected_restaurant_data = self.restaurant_lookup.apply_inference_and_select(candidates, self.tm.additional_requirements)
-                if isinstance(selected_restaurant_data, dict):
-                    print("DEBUG: Found a matching restaurant")
-                    self.suggest_specific_restaurant(selected_restaurant_data, self.tm.additional_requirements, is_alternative=(combination != ['location', 'price_range', 'food_type']))
-                    return  # Exit the method after suggesting a restaurant
-                else:
-                    print("DEBUG: No restaurant found matching additional requirements, trying without them")
-                    selected_restaurant_data = self.restaurant_lookup.apply_inference_and_select(candidates, {})
-                    if isinstance(selected_restaurant_data, dict):
-                        print("DEBUG: Found a restaurant without considering additional requirements")
-                        self.suggest_specific_restaurant(selected_restaurant_data, {}, is_alternative=True)
-                        return  # Exit the method after suggesting a restaurant
-            
+        # Usually some restaurant meets every preference and requirement; select_restaurant finds the best of
+        # them from the candidate cache and the requirement masks, without planning a relaxation
+        selected = self.restaurant_lookup.select_restaurant(self.tm.preferences, self.tm.additional_requirements)
+        if not isinstance(selected, str):
+            print("DEBUG: Found a matching restaurant")
+            self.suggest_specific_restaurant(selected, self.tm.additional_requirements)
+            return
+
+        # One pass over the restaurant table finds the strictest preference combination with a match
+        plan = self.restaurant_lookup.plan_relaxation(self.tm.preferences, self.tm.additional_requirements)
+
+        for combination in plan['relaxed']:
+            print(f"DEBUG: No candidates for preference combination: {combination}")
             if combination:
                 removed_pref = set(self.tm.preferences.keys()) - set(combination)
                 removed_pref = list(removed_pref)[0] if removed_pref else "all primary"
                 message = self.get_relaxed_preference_message(removed_pref)
                 self.output_message(message)
 
-        if all(candidates.empty for candidates in [self.restaurant_lookup.get_candidates({k: self.tm.preferences[k]}) for k in combination if k in self.tm.preferences] for combination in preference_combinations):
-            message = "I apologize, but I couldn't find any restaurants in our database. Please try again with different preferences."
-            self.output_message(message)
-            self.handle_goodbye()  # End the conversation if no restaurants are found
+        if plan['selected'] is not None:
+            if plan['requirements'] == self.tm.additional_requirements:
+                print("DEBUG: Found a matching restaurant")
+                is_alternative = plan['combination'] != PREFERENCE_COMBINATIONS[0]
+            else:
+                print("DEBUG: Found a restaurant without considering additional requirements")
+                is_alternative = True
+            self.suggest_specific_restaurant(plan['selected'], plan['requirements'], is_alternative=is_alternative)
+            return  # Exit the method after suggesting a restaurant
+
+        # Only reached when the restaurant table is empty
+        message = "I apologize, but I couldn't find any restaurants in our database. Please try again with different preferences."
+        self.output_message(message)
+        self.handle_goodbye()  # End the conversation if no restaurants are found
 
         self.first_suggestion = True
         self.tm.set_state("10. Intermediate (Alternative) State")
@@ -349,21 +348,9 @@ class DialogueManager:
         self.output_message(question)
 
     def handle_suggest_restaurant(self):
-        candidates = self.restaurant_lookup.get_candidates(self.tm.preferences)
-        selected_restaurant_data = self.restaurant_lookup.apply_inference_and_select(candidates, self.tm.additional_requirements)
-    
-        if isinstance(selected_restaurant_data, str):
-            message = "No matching restaurants found." if not assignment_1c.config.use_formal_language else "Regrettably, no restaurants meet your preferences."
-            self.output_message(message)
-        else:
-            reasoning = self.restaurant_lookup.generate_reasoning(selected_restaurant_data, self.tm.additional_requirements)
-            message = f"I recommend {selected_restaurant_data['restaurant']['restaurantname']}. {reasoning}"
-            if assignment_1c.config.use_formal_language:
-                message = f"Based on your preferences, I recommend {selected_restaurant_data['restaurant']['restaurantname']}. {reasoning}"
-            self.output_message(message)
-
-        self.tm.set_state("10. Intermediate (Alternative) State")
-        self.tm.speak()
+        # Relaxes the preferences when nothing matches, and moves on to the alternatives if the best match was
+        # already suggested, so a restaurant is never suggested twice in a row
+        self.suggest_restaurant(allow_alternatives=False)
 
     def handle_intermediate_state(self, user_input: str, dialogue_act: str):
         print(f"DEBUG: Handling intermediate state. User input: {user_input}, Dialogue act: {dialogue_act}")
@@ -390,58 +377,62 @@ class DialogueManager:
         primary_preferences = {k: v for k, v in self.tm.preferences.items() if k in ['location', 'price_range', 'food_type']}
         additional_requirements = self.tm.additional_requirements.copy()
         
-        preference_combinations = [
-            ['location', 'price_range', 'food_type'],
-            ['location', 'price_range'],
-            ['location', 'food_type'],
-            ['price_range', 'food_type'],
-            ['location'],
-            ['price_range'],
-            ['food_type'],
-            []
-        ]
-        
-        for combination in preference_combinations:
-            print(f"DEBUG: Trying preference combination: {combination}")
-            current_preferences = {k: primary_preferences[k] for k in combination if k in primary_preferences}
-            print(f"DEBUG: Current preferences for this iteration: {current_preferences}")
-            
-            candidates = self.restaurant_lookup.get_candidates(current_preferences)
-            print(f"DEBUG: Number of candidates found: {len(candidates)}")
-            
-            if not candidates.empty:
-                candidates = candidates[~candidates['restaurantname'].isin(self.suggested_restaurants)]
-                print(f"DEBUG: Number of candidates after filtering suggested restaurants: {len(candidates)}")
-                
-                if not candidates.empty:
-                    selected_restaurant = self.restaurant_lookup.apply_inference_and_select(candidates, additional_requirements)
-                    print(f"DEBUG: Selected restaurant: {selected_restaurant}")
-                    
-                    if isinstance(selected_restaurant, dict):
-                        self.suggest_specific_restaurant(selected_restaurant, additional_requirements)
-                        return
-                    else:
-                        print(f"DEBUG: No restaurant found matching additional requirements: {additional_requirements}")
-                else:
-                    print("DEBUG: All candidates have been suggested before")
-            else:
-                print("DEBUG: No candidates found for this preference combination")
-            
+        ranked = self.next_ranked_restaurant(primary_preferences, additional_requirements)
+        # Every combination stricter than the one the restaurant meets has no unsuggested match left
+        relaxed = PREFERENCE_COMBINATIONS[:ranked[1]] if ranked else PREFERENCE_COMBINATIONS
+
+        for combination in relaxed:
+            print(f"DEBUG: No unsuggested restaurant matches preference combination {combination} and {additional_requirements}")
             if combination:
                 removed_pref = set(primary_preferences.keys()) - set(combination)
                 removed_pref = list(removed_pref)[0] if removed_pref else "all primary"
                 message = self.get_relaxed_preference_message(removed_pref)
                 self.output_message(message)
-        
+
+        if ranked:
+            self.suggest_specific_restaurant(ranked[0], additional_requirements)
+            return
+
         message = self.get_no_more_restaurants_message()
         self.output_message(message)
         
         self.suggested_restaurants.clear()
+        self.ranking_key = None
         print("DEBUG: Cleared suggested restaurants list")
         
         self.tm.set_state("10. Intermediate (Alternative) State")
         self.tm.speak()
 
+    def next_ranked_restaurant(self, primary_preferences: dict, additional_requirements: dict):
+        """
+        The best ranked restaurant not suggested yet, as (selection, preference combination index), or None.
+        Pages through one ranking until the preferences, requirements, restaurant table or rules change.
+        """
+        lookup = self.restaurant_lookup
+        lookup.refresh_if_changed()
+        # The ranked labels are resolved against the state they were ranked in
+        state = lookup.state
+        key = (
+            lookup.normalize_preferences(primary_preferences), tuple(sorted(additional_requirements.items())),
+            state.store.version, state.rules_version
+        )
+        if key != self.ranking_key:
+            self.ranking = deque()
+            self.ranking_key = key
+        refilled = False
+        while True:
+            while self.ranking:
+                label, level = self.ranking.popleft()
+                if state.restaurant_data.at[label, 'restaurantname'] not in self.suggested_restaurants:
+                    return lookup.selection(label, state), level
+            if refilled:
+                return None
+            self.ranking = deque(lookup.rank_restaurants(
+                primary_preferences, additional_requirements, exclude=self.suggested_restaurants,
+                top_k=assignment_1c.config.ranking_page_size, state=state
+            ))
+            refilled = True
+
     def get_relaxed_preference_message(self, pref):
         if pref == "all primary":
             if assignment_1c.config.use_formal_language:
@@ -480,10 +471,7 @@ class DialogueManager:
     def output_message(self, message):
         if assignment_1c.config.all_caps:
             message = message.upper()
-        print(message)
-        if assignment_1c.config.text_to_speech:
-            self.tm.tts_engine.say(message)
-            self.tm.tts_engine.runAndWait()
+        self.tm.say(message)
 
     def handle_goodbye(self):
         self.tm.set_state("9. Goodbye")
@@ -0,0 +1,110 @@
+# assignment_1b/batch_extraction.py
+# Replays logged user utterances through the preference extractor, for auditing slot filling.
+# Input is streamed in chunks, so memory use does not grow with the size of the log.
+# Run from the root directory:
+#   python -m assignment_1b.batch_extraction utterances.jsonl [--field text] [--workers N] [--output slots.jsonl]
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from assignment_1b.extract_preferences import PreferenceExtractor
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# One extractor per process; its phrase index and fuzzy matchers are shared by every chunk
+_extractor = None
+
+
+def _init_worker():
+    global _extractor
+    _extractor = PreferenceExtractor()
+
+
+def _extract_chunk(utterances: list) -> list:
+    return _extractor.extract_preferences_batch(utterances)
+
+
+def read_utterances(path: str, field: str = 'text'):
+    """
+    Lazily reads utterances from a JSONL file. Each line is either a JSON string or an object
+    holding the utterance under `field`; blank lines are skipped.
+    """
+    with open(path, encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield record
+            elif isinstance(record, dict) and isinstance(record.get(field), str):
+                yield record[field]
+            else:
+                raise ValueError(f"{path}:{line_number} has no string field '{field}'")
+
+
+def iter_preferences(utterances, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE, extractor=None):
+    """
+    Lazily yields (utterance, preferences, fallback_preferences) for any iterable of utterances, in input order.
+
+    Input that fits in a single chunk, or workers <= 1, is extracted in this process. Otherwise chunks are
+    fanned out over a process pool, with at most two chunks per worker in flight, so memory use stays
+    constant however long the input is.
+    """
+    iterator = iter(utterances)
+    first = list(islice(iterator, chunk_size))
+    if workers <= 1 or len(first) < chunk_size:
+        extractor = extractor or PreferenceExtractor()
+        chunk = first
+        while chunk:
+            yield from zip(chunk, *zip(*extractor.extract_preferences_batch(chunk)))
+            chunk = list(islice(iterator, chunk_size))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        chunk = first
+        while chunk or pending:
+            while chunk and len(pending) < 2 * workers:
+                pending.append((chunk, pool.submit(_extract_chunk, chunk)))
+                chunk = list(islice(iterator, chunk_size))
+            done, future = pending.popleft()
+            yield from zip(done, *zip(*future.result()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract preference slots from logged utterances.")
+    parser.add_argument("input", help="JSONL file of utterances, or - for one utterance per line on stdin")
+    parser.add_argument("--field", default='text', help="utterance field of JSON object lines")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", help="JSONL file for the results (default: stdout)")
+    args = parser.parse_args()
+
+    if args.input == '-':
+        utterances = (line.rstrip('\n') for line in sys.stdin)
+    else:
+        utterances = read_utterances(args.input, args.field)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    start = time.perf_counter()
+    count = 0
+    try:
+        for utterance, preferences, fallback_preferences in iter_preferences(
+            utterances, workers=args.workers, chunk_size=args.chunk_size
+        ):
+            output.write(json.dumps({
+                'utterance': utterance,
+                'preferences': preferences,
+                'fallback_preferences': fallback_preferences,
+            }) + '\n')
+            count += 1
+    finally:
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(f"Extracted preferences from {count} utterances in {elapsed:.1f}s", file=sys.stderr)
@@ -0,0 +1,212 @@
+# assignment_1b/dialogue_server.py
+# Serves many dialogues from one process over a small JSON/HTTP API. Every session has its own
+# TransitionManager and DialogueManager; the classifier, preference extractor and restaurant lookup are
+# shared by all of them. Turns run in a thread pool, so a slow turn (or a restaurant table reload it triggers)
+# does not hold up the event loop and the other sessions; each session runs one turn at a time.
+#
+#   POST   /sessions          start a session       -> {"session": id, "messages": [...], "done": false}
+#   POST   /sessions/<id>     {"text": "..."}       -> {"messages": [...], "done": bool}
+#   DELETE /sessions/<id>     end a session
+#   GET    /stats             sessions and cache statistics
+#
+# Start it with python main.py --serve [--host 127.0.0.1] [--port 8080]
+
+import asyncio
+import json
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from assignment_1b.Dialogue_manager import DialogueManager
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class Session:
+    """One user's dialogue and the system messages it produced since the last reply."""
+
+    def __init__(self, dialogue_manager: DialogueManager, messages: list):
+        self.dialogue_manager = dialogue_manager
+        self.messages = messages
+        # A session handles one turn at a time, even if its client sends several at once
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+
+    def take_messages(self) -> list:
+        # States without a prompt produce empty messages, which the console shows as blank lines
+        messages = [message for message in self.messages if message]
+        self.messages.clear()
+        return messages
+
+
+class DialogueServer:
+    def __init__(self, make_transition_manager, preference_extractor, model, restaurant_lookup,
+                 workers: int = 4, max_sessions: int = 1000, session_timeout: float = 1800):
+        """
+        :param make_transition_manager: Callable building a fresh TransitionManager for a session, given the
+                                        callable its system messages should go to (main.initialize_states)
+        :param workers: Threads running dialogue turns
+        :param max_sessions: Sessions kept at once; new sessions are refused beyond that
+        :param session_timeout: Seconds after which an idle session is ended
+        """
+        self.make_transition_manager = make_transition_manager
+        self.preference_extractor = preference_extractor
+        self.model = model
+        self.restaurant_lookup = restaurant_lookup
+        self.max_sessions = max_sessions
+        self.session_timeout = session_timeout
+        self.sessions = {}
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dialogue")
+        self.turns = 0
+
+    def expire_sessions(self):
+        deadline = time.monotonic() - self.session_timeout
+        for session_id in [key for key, session in self.sessions.items() if session.last_active < deadline]:
+            del self.sessions[session_id]
+
+    async def expire_periodically(self):
+        """Ends idle sessions even while no new sessions are opened."""
+        while True:
+            await asyncio.sleep(min(60.0, self.session_timeout / 2))
+            self.expire_sessions()
+
+    @staticmethod
+    def start_dialogue(dialogue_manager: DialogueManager):
+        """Runs in the pool: speaks the welcome and runs the states before the first question."""
+        dialogue_manager.tm.speak()
+        dialogue_manager.awaiting_input()
+
+    @staticmethod
+    def take_turn(dialogue_manager: DialogueManager, text: str) -> (bool, bool):
+        """Runs in the pool: handles one user answer; returns whether it was handled and whether the dialogue ended."""
+        handled = dialogue_manager.awaiting_input()
+        if handled:
+            dialogue_manager.process_input(text.strip())
+        return handled, not dialogue_manager.awaiting_input()
+
+    async def open_session(self):
+        """Starts a dialogue; returns its id and the welcome messages, or None if the server is full."""
+        self.expire_sessions()
+        if len(self.sessions) >= self.max_sessions:
+            return None
+        messages = []
+        tm = self.make_transition_manager(messages.append)
+        dialogue_manager = DialogueManager(tm, self.preference_extractor, self.model, self.restaurant_lookup)
+        session = Session(dialogue_manager, messages)
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = session
+        async with session.lock:
+            await asyncio.get_running_loop().run_in_executor(self.pool, self.start_dialogue, dialogue_manager)
+            return session_id, session.take_messages()
+
+    async def reply(self, session_id: str, text: str):
+        """Handles one user answer; returns the system messages and whether the dialogue ended, or None if unknown."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        async with session.lock:
+            session.last_active = time.monotonic()
+            handled, done = await asyncio.get_running_loop().run_in_executor(
+                self.pool, self.take_turn, session.dialogue_manager, text
+            )
+            self.turns += handled
+            if done:
+                self.sessions.pop(session_id, None)
+            return session.take_messages(), done
+
+    def close_session(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        stats = {'sessions': len(self.sessions), 'turns': self.turns}
+        if hasattr(self.model, 'stats'):
+            stats['prediction_cache'] = self.model.stats()
+        stats['candidate_cache'] = self.restaurant_lookup.cache_stats()
+        return stats
+
+    async def route(self, method: str, path: str, body: bytes):
+        """Returns the status code and JSON payload for one request."""
+        parts = [part for part in path.split('?', 1)[0].split('/') if part]
+        if parts == ['stats']:
+            return (200, self.stats()) if method == 'GET' else (405, {'error': "use GET"})
+        if not parts or parts[0] != 'sessions' or len(parts) > 2:
+            return 404, {'error': f"unknown path {path}"}
+        if len(parts) == 1:
+            if method != 'POST':
+                return 405, {'error': "use POST to start a session"}
+            opened = await self.open_session()
+            if opened is None:
+                return 503, {'error': "too many sessions"}
+            session_id, messages = opened
+            return 200, {'session': session_id, 'messages': messages, 'done': False}
+
+        session_id = parts[1]
+        if method == 'DELETE':
+            return (200, {'closed': session_id}) if self.close_session(session_id) else (404, {'error': "unknown session"})
+        if method != 'POST':
+            return 405, {'error': "use POST to reply or DELETE to end the session"}
+        try:
+            text = json.loads(body or b'{}').get('text', '')
+        except (ValueError, AttributeError):
+            return 400, {'error': "expected a JSON object with a text field"}
+        if not isinstance(text, str):
+            return 400, {'error': "text must be a string"}
+        replied = await self.reply(session_id, text)
+        if replied is None:
+            return 404, {'error': "unknown session"}
+        messages, done = replied
+        return 200, {'messages': messages, 'done': done}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers HTTP/1.1 requests on one connection until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                try:
+                    status, payload = await self.route(method.upper(), path, body)
+                except Exception:
+                    # One failing dialogue must not take the other sessions down
+                    traceback.print_exc()
+                    status, payload = 500, {'error': "the dialogue failed on this input"}
+                content = json.dumps(payload).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving dialogues on http://{address[0]}:{address[1]}")
+        expiry = asyncio.create_task(self.expire_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
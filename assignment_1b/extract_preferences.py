@@ -1,15 +1,16 @@
 import re
-import random
 import assignment_1c.config
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import nltk
-import Levenshtein as lev
+from functools import lru_cache
 from typing import Tuple, Dict, Any
+from assignment_1b.tokenizer import tokenize, stop_words
+from assignment_1b.phrase_index import PhraseIndex
+from assignment_1b.fuzzy_matcher import FuzzyMatcher
 
-# Ensure the stopwords corpus is downloaded
-nltk.download('stopwords', quiet=True)
-nltk.download('punkt', quiet=True)
+
+@lru_cache(maxsize=None)
+def fuzzy_stop_words() -> frozenset:
+    """Words never fuzzy matched against keywords, loaded once."""
+    return stop_words() | {'need', 'area', 'any', 'price', 'pricerange'}
 
 
 class PreferenceExtractor:
@@ -36,7 +37,7 @@ class PreferenceExtractor:
         # Synonym mappings for preferences
         self.price_synonyms = {
             'cheap': ['cheap', 'inexpensive', 'affordable', 'budget', 'low-cost', 'economical', 'bargain', 'value'],
-            'moderate': ['moderate', 'mid-priced', 'mid-range', 'average price', 'reasonably priced', 'standard-priced'],
+            'moderate': ['moderate', 'moderately', 'mid-priced', 'mid-range', 'average price', 'reasonably priced', 'standard-priced'],
             'expensive': ['expensive', 'pricey', 'high-end', 'luxurious', 'costly', 'upscale', 'premium', 'deluxe']
         }
 
@@ -54,14 +55,14 @@ class PreferenceExtractor:
         }
 
         self.cuisine_synonyms = {
-            'british': ['british', 'english', 'traditional'],
-            'italian': ['italian', 'pasta', 'pizza', 'spaghetti', 'lasagna'],
-            'chinese': ['chinese', 'noodles', 'dim sum', 'mandarin cuisine'],
-            'indian': ['indian', 'curry', 'tandoori', 'biryani', 'masala'],
-            'japanese': ['japanese', 'sushi', 'sashimi', 'ramen'],
-            'french': ['french', 'bistro', 'brasserie', 'patisserie'],
-            'thai': ['thai', 'pad thai', 'spicy noodles'],
-            'spanish': ['spanish', 'tapas', 'paella'],
+            'british': ['british', 'english', 'traditional', 'britain', 'england'],
+            'italian': ['italian', 'pasta', 'pizza', 'spaghetti', 'lasagna', 'italy'],
+            'chinese': ['chinese', 'noodles', 'dim sum', 'mandarin cuisine', 'china'],
+            'indian': ['indian', 'curry', 'tandoori', 'biryani', 'masala', 'india'],
+            'japanese': ['japanese', 'sushi', 'sashimi', 'ramen', 'japan'],
+            'french': ['french', 'bistro', 'brasserie', 'patisserie', 'france'],
+            'thai': ['thai', 'pad thai', 'spicy noodles', 'thailand'],
+            'spanish': ['spanish', 'tapas', 'paella', 'spain'],
             'seafood': ['seafood', 'fish', 'oysters', 'shrimp'],
             'steakhouse': ['steakhouse', 'steak', 'grill', 'beef', 'meat lovers'],
             # Add more cuisines and their synonyms as needed
@@ -78,6 +79,32 @@ class PreferenceExtractor:
         # Additional requirements keywords
         self.additional_requirements_keywords = ['romantic', 'touristic', 'children', 'assigned seats']
 
+        self.phrase_index = self._build_phrase_index()
+        # Fuzzy matchers per keyword list, built on first use
+        self.fuzzy_matchers = {}
+
+    def _build_phrase_index(self) -> PhraseIndex:
+        """
+        Compiles every vocabulary into one phrase index. Ranks encode the order in which the slots
+        used to be checked: no-preference phrases first, then broader food categories, then synonyms,
+        each in the order they are listed above.
+        """
+        index = PhraseIndex()
+        slots = [
+            ('food_type', self.no_food_preference_phrases, self.cuisine_synonyms),
+            ('price_range', self.no_price_preference_phrases, self.price_synonyms),
+            ('location', self.no_location_preference_phrases, self.location_synonyms),
+        ]
+        for slot, no_preference_phrases, synonyms in slots:
+            for phrase in no_preference_phrases:
+                index.add(phrase, slot, (0, 0), 'any')
+            for i, (value, phrases) in enumerate(synonyms.items()):
+                for phrase in phrases:
+                    index.add(phrase, slot, (2, i), value)
+        for i, (broad_term, specific_cuisines) in enumerate(self.broader_food_categories.items()):
+            index.add(broad_term, 'food_type', (1, i), '|'.join(specific_cuisines))
+        return index
+
     def extract_preferences(self, user_input: str):
         """
         Extracts preferences from user input, including food type, price range, and location.
@@ -90,82 +117,65 @@ class PreferenceExtractor:
         preferences = {}
         fallback_preferences = []
 
-        preferences['food_type'] = self._extract_food_type(user_input)
-        preferences['price_range'] = self._extract_price_range(user_input)
-        preferences['location'] = self._extract_location(user_input)
+        # One pass over the tokens fills every slot mentioned by a known phrase
+        matches = self.phrase_index.match(tokenize(user_input))
+        keyword_lists = {
+            'food_type': self.food_keywords,
+            'price_range': self.price_keywords,
+            'location': self.location_keywords,
+        }
+        for slot, keyword_list in keyword_lists.items():
+            # If no phrase was found, attempt to match directly
+            preferences[slot] = matches[slot] if slot in matches else self._match_closest(user_input, keyword_list)
 
         # Extract fallback preferences
         fallback_preferences = self._extract_fallback_preferences(user_input)
 
         return preferences, fallback_preferences
 
-    def _extract_food_type(self, user_input: str) -> str:
-        # First, check for phrases indicating no preference
-        if any(phrase in user_input for phrase in self.no_food_preference_phrases):
-            return 'any'
+    def extract_preferences_batch(self, utterances: list) -> list:
+        """
+        Extracts preferences from every utterance, in order. Repeated utterances are only extracted once.
 
-        # Check for broader food categories
-        for broad_term, specific_cuisines in self.broader_food_categories.items():
-            if broad_term in user_input:
-                return '|'.join(specific_cuisines)
+        :param utterances: List of user inputs
+        :return: List of (preferences, fallback_preferences) tuples, one per utterance
+        """
+        results = {}
+        for user_input in utterances:
+            key = user_input.lower()
+            if key not in results:
+                results[key] = self.extract_preferences(key)
+        # Copies, so callers can update one result without changing its duplicates
+        return [
+            (dict(preferences), list(fallbacks))
+            for preferences, fallbacks in (results[user_input.lower()] for user_input in utterances)
+        ]
 
-        # Check for cuisine synonyms
-        for cuisine, synonyms in self.cuisine_synonyms.items():
-            for synonym in synonyms:
-                if synonym in user_input:
-                    return cuisine
+    def _extract_slot(self, user_input: str, slot: str, keyword_list: list) -> str:
+        matches = self.phrase_index.match(tokenize(user_input))
+        if slot in matches:
+            return matches[slot]
+        return self._match_closest(user_input, keyword_list)
 
-        # If no synonym found, attempt to match directly
-        return self._match_closest(user_input, self.food_keywords)
+    def _extract_food_type(self, user_input: str) -> str:
+        return self._extract_slot(user_input, 'food_type', self.food_keywords)
 
     def _extract_price_range(self, user_input: str) -> str:
-        # Check for phrases indicating no preference
-        if any(phrase in user_input for phrase in self.no_price_preference_phrases):
-            return 'any'
-
-        for price_range, synonyms in self.price_synonyms.items():
-            for synonym in synonyms:
-                if synonym in user_input:
-                    return price_range
-
-        # If no synonym found, attempt to match directly
-        return self._match_closest(user_input, self.price_keywords)
+        return self._extract_slot(user_input, 'price_range', self.price_keywords)
 
     def _extract_location(self, user_input: str) -> str:
-        # Check for phrases indicating no preference
-        if any(phrase in user_input for phrase in self.no_location_preference_phrases):
-            return 'any'
+        return self._extract_slot(user_input, 'location', self.location_keywords)
 
-        for location, synonyms in self.location_synonyms.items():
-            for synonym in synonyms:
-                if synonym in user_input:
-                    return location
-
-        # If no synonym found, attempt to match directly
-        return self._match_closest(user_input, self.location_keywords)
+    def _fuzzy_matcher(self, keyword_list: list) -> FuzzyMatcher:
+        key = tuple(keyword_list)
+        if key not in self.fuzzy_matchers:
+            self.fuzzy_matchers[key] = FuzzyMatcher(keyword_list, fuzzy_stop_words())
+        return self.fuzzy_matchers[key]
 
     def _match_closest(self, user_input: str, keyword_list: list) -> str:
         if assignment_1c.config.levenshtein:
-            # Use Levenshtein distance for fuzzy matching
-            words = word_tokenize(user_input)
-            stop_words = set(stopwords.words('english'))
-            stop_words.update(['need', 'area', 'any', 'price', 'pricerange'])
-            words = [word for word in words if word.lower() not in stop_words and len(word) > 4]
-            closest_matches = []
-            min_distance = float('inf')
-            for word in words:
-                for keyword in keyword_list:
-                    distance = lev.distance(word.lower(), keyword.lower())
-                    max_distance = 1 if len(word) <= 5 else 2 if len(word) <= 8 else 3
-                    if distance < min_distance and distance <= max_distance:
-                        min_distance = distance
-                        closest_matches = [keyword]
-                    elif distance == min_distance and distance <= max_distance:
-                        closest_matches.append(keyword)
-            if min_distance <= 3:
-                return random.choice(closest_matches)
-            else:
-                return None
+            # Use Levenshtein distance for fuzzy matching; ties go to the keyword listed first
+            return self._fuzzy_matcher(keyword_list).best(user_input)
         else:
             # Use exact matching
             for keyword in keyword_list:
@@ -199,8 +209,7 @@ class PreferenceExtractor:
         user_input = user_input.lower()
         additional_requirements = {}
 
-        words = word_tokenize(user_input)
-        words_set = set(words)
+        words_set = set(tokenize(user_input))
 
         for keyword in self.additional_requirements_keywords:
             if keyword in words_set:
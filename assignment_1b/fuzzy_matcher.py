@@ -0,0 +1,99 @@
+# assignment_1b/fuzzy_matcher.py
+
+from functools import lru_cache
+import Levenshtein as lev
+from assignment_1b.tokenizer import tokenize
+
+# Words of fewer characters are never fuzzy matched
+MIN_LENGTH = 5
+
+# The largest edit distance max_distance allows
+MAX_DISTANCE = 3
+
+
+def max_distance(word: str) -> int:
+    """The edit distance tolerated for a word, growing with its length; short words must match exactly."""
+    if len(word) < MIN_LENGTH:
+        return 0
+    return 1 if len(word) <= 5 else 2 if len(word) <= 8 else MAX_DISTANCE
+
+
+def deletions(word: str, distance: int) -> set:
+    """Every string obtained by deleting up to `distance` characters from word, including word itself."""
+    variants = {word}
+    level = {word}
+    for _ in range(distance):
+        level = {variant[:i] + variant[i + 1:] for variant in level for i in range(len(variant))}
+        variants |= level
+    return variants
+
+
+class FuzzyMatcher:
+    """
+    Finds keywords that are misspelled in user input.
+
+    Single-word keywords are looked up in a symmetric deletion index (as in SymSpell): two words within
+    edit distance d share a variant with at most d characters deleted from each, so only keywords sharing
+    a variant with the input word are compared with Levenshtein distance. Multi-word keywords
+    ("modern european") are compared word by word against windows of the same length.
+    """
+
+    def __init__(self, keywords: list, stop_words: set = frozenset(), cache_size: int = 4096):
+        self.keywords = list(keywords)
+        self.stop_words = stop_words
+        self.order = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self.index = {}
+        self.phrases = []
+        for keyword in self.keywords:
+            tokens = tokenize(keyword)
+            if len(tokens) == 1:
+                for variant in deletions(tokens[0], MAX_DISTANCE):
+                    self.index.setdefault(variant, set()).add(keyword)
+            else:
+                self.phrases.append((keyword, tokens))
+        # User input repeats the same words, so their matches are remembered
+        self._word_matches = lru_cache(maxsize=cache_size)(self._find_word_matches)
+
+    def _find_word_matches(self, word: str) -> tuple:
+        allowed = max_distance(word)
+        if allowed == 0 or word in self.stop_words:
+            return ()
+        candidates = set()
+        for variant in deletions(word, allowed):
+            candidates.update(self.index.get(variant, ()))
+        matches = ((keyword, lev.distance(word, keyword, score_cutoff=allowed)) for keyword in candidates)
+        return tuple((keyword, distance) for keyword, distance in matches if distance <= allowed)
+
+    def _phrase_matches(self, tokens: list):
+        for keyword, keyword_tokens in self.phrases:
+            size = len(keyword_tokens)
+            for start in range(len(tokens) - size + 1):
+                distance = 0
+                for word, keyword_word in zip(tokens[start:start + size], keyword_tokens):
+                    allowed = max_distance(word)
+                    if abs(len(word) - len(keyword_word)) > allowed:
+                        break
+                    word_distance = lev.distance(word, keyword_word, score_cutoff=allowed)
+                    if word_distance > allowed:
+                        break
+                    distance += word_distance
+                else:
+                    yield keyword, distance
+
+    def rank(self, user_input: str) -> list:
+        """
+        Returns (keyword, distance) pairs for every keyword close enough to a word or phrase in the input,
+        best first: smallest distance, then multi-word keywords, then the order of the keyword list.
+        """
+        tokens = tokenize(user_input)
+        best = {}
+        matches = [match for word in tokens for match in self._word_matches(word)]
+        for keyword, distance in matches + list(self._phrase_matches(tokens)):
+            if distance < best.get(keyword, MAX_DISTANCE + 1):
+                best[keyword] = distance
+        return sorted(best.items(), key=lambda item: (item[1], -len(item[0].split()), self.order[item[0]]))
+
+    def best(self, user_input: str):
+        """The best ranked keyword, or None if nothing is close enough."""
+        ranked = self.rank(user_input)
+        return ranked[0][0] if ranked else None
@@ -1,39 +1,327 @@
+import numpy as np
 import pandas as pd
 import os
-import random
-from assignment_1c.reasoner import InferenceEngine, Literal, rules
+import threading
+import time
+from collections import OrderedDict
+from assignment_1c.reasoner import BatchInference, InferenceEngine
+from assignment_1c.rule_set import RuleSet, load_rules, rules_path as default_rules_path
+from assignment_1b.restaurant_index import RestaurantIndex, SLOT_COLUMNS
+from assignment_1b.restaurant_store import load_store
+
+
+# Restaurant columns the inference rules read
+INFERENCE_COLUMNS = ['pricerange', 'food_quality', 'food', 'crowdedness', 'length_of_stay']
+
+# Primary preferences kept at each relaxation step, strictest first
+PREFERENCE_COMBINATIONS = [
+    ['location', 'price_range', 'food_type'],
+    ['location', 'price_range'],
+    ['location', 'food_type'],
+    ['price_range', 'food_type'],
+    ['location'],
+    ['price_range'],
+    ['food_type'],
+    []
+]
+
+# Weights of the recommendation score: each primary preference a restaurant meets, the share of additional
+# requirements it meets, good food quality and not being busy
+SCORE_WEIGHTS = {
+    'food_type': 4.0,
+    'location': 3.0,
+    'price_range': 2.0,
+    'requirements': 2.0,
+    'food_quality': 1.0,
+    'crowdedness': 0.5,
+}
+
+
+class LookupState:
+    """
+    One generation of everything RestaurantLookup derives from the restaurant table and the rules. It is never
+    modified once published: a reload or a rule change publishes a new state, so a lookup that reads the state
+    once sees one table, its index and the inference results over it. The requirement masks and candidate
+    positions are caches of this state only.
+    """
+
+    __slots__ = ('csv_stat', 'store', 'restaurant_data', 'index', 'static_scores', 'inference_engine',
+                 'inference_results', 'inferred_table', 'rules_version', 'requirement_masks', 'candidate_cache')
+
+    def __init__(self, csv_stat, store, restaurant_data: pd.DataFrame, index: RestaurantIndex, static_scores: np.ndarray,
+                 inference_engine: InferenceEngine, inference_results: BatchInference, rules_version: int,
+                 candidate_cache: OrderedDict = None):
+        self.csv_stat = csv_stat
+        self.store = store
+        self.restaurant_data = restaurant_data
+        self.index = index
+        self.static_scores = static_scores
+        self.inference_engine = inference_engine
+        self.inference_results = inference_results
+        self.inferred_table = inference_results.inferred
+        # Bumped whenever the rules are replaced, so results derived from inference can be keyed on it
+        self.rules_version = rules_version
+        self.requirement_masks = {}
+        # Candidate positions per normalized preference tuple, least recently used first; they only depend on
+        # the table, so a rule change keeps them
+        self.candidate_cache = OrderedDict() if candidate_cache is None else candidate_cache
+
+    def with_inference(self, inference_engine: InferenceEngine, inference_results: BatchInference) -> 'LookupState':
+        """The same table with the results of other rules."""
+        return LookupState(self.csv_stat, self.store, self.restaurant_data, self.index, self.static_scores,
+                           inference_engine, inference_results, self.rules_version + 1, self.candidate_cache)
 
 
 class RestaurantLookup:
-    def __init__(self, csv_path=None):
+    def __init__(self, csv_path=None, cache_size: int = 1024, rules_path: str = default_rules_path,
+                 refresh_interval: float = 1.0):
+        """
+        :param refresh_interval: Seconds between checks whether the CSV or the rule file changed on disk
+                                 (0 checks on every lookup)
+        """
         if csv_path is None:
             csv_path = os.path.join(
                 os.getcwd(),"data", "restaurant_info_extended.csv")
-        self.restaurant_data = pd.read_csv(csv_path)
-        print(f"DEBUG: Loaded {len(self.restaurant_data)} restaurants from CSV")
-        self.inference_engine = InferenceEngine(rules)
+        self.csv_path = csv_path
+        self.rules_path = rules_path
+        self.rules_stat = self._stat(rules_path)
+        self.refresh_interval = refresh_interval
+        self.next_refresh = time.monotonic() + refresh_interval
+        self.cache_size = cache_size
+        # Guards the candidate caches and their counters
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Sessions served from threads call refresh_if_changed concurrently; one of them reloads
+        self._refresh_lock = threading.Lock()
+        self.state = self._load(InferenceEngine(load_rules(rules_path)), 0)
+
+    @property
+    def restaurant_data(self) -> pd.DataFrame:
+        """The restaurant table of the current state."""
+        return self.state.restaurant_data
+
+    @property
+    def inference_engine(self) -> InferenceEngine:
+        """The inference engine of the current state."""
+        return self.state.inference_engine
+
+    def _load(self, inference_engine: InferenceEngine, rules_version: int) -> LookupState:
+        """
+        Loads the restaurant table from the columnar store, rebuilding the store first if the CSV changed, and
+        builds everything derived from it. Sessions keep using the previous state until this one is published.
+        """
+        csv_stat = self._stat(self.csv_path)
+        store = load_store(self.csv_path)
+        restaurant_data = store.to_frame()
+        print(f"DEBUG: Loaded {len(restaurant_data)} restaurants from store version {store.version}")
+        index = RestaurantIndex(restaurant_data)
+        inference_results = self._infer(inference_engine, restaurant_data)
+        # The parts of the score that do not depend on the user
+        static_scores = (
+            SCORE_WEIGHTS['food_quality'] * (restaurant_data['food_quality'] == 'good').to_numpy(dtype=float)
+            + SCORE_WEIGHTS['crowdedness'] * (restaurant_data['crowdedness'] == 'not busy').to_numpy(dtype=float)
+        )
+        return LookupState(csv_stat, store, restaurant_data, index, static_scores, inference_engine,
+                           inference_results, rules_version)
+
+    def reload(self):
+        """(Re)loads the restaurant table with the current rules."""
+        with self._refresh_lock:
+            state = self.state
+            self.state = self._load(state.inference_engine, state.rules_version)
+
+    @staticmethod
+    def _stat(path: str):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed_rules(self):
+        """The rules compiled again if the rule file changed on disk, else None; an invalid file keeps the current rules."""
+        rules_stat = self._stat(self.rules_path)
+        if rules_stat == self.rules_stat:
+            return None
+        self.rules_stat = rules_stat
+        try:
+            return load_rules(self.rules_path)
+        except ValueError as error:
+            print(f"DEBUG: Keeping the current rules, {self.rules_path} is invalid: {error}")
+            return None
+
+    def set_rules(self, rule_set: RuleSet):
+        """Evaluates these rules from now on and re-runs inference over the restaurant table."""
+        with self._refresh_lock:
+            self.state = self._with_rules(self.state, InferenceEngine(rule_set))
+
+    def _with_rules(self, state: LookupState, inference_engine: InferenceEngine) -> LookupState:
+        return state.with_inference(inference_engine, self._infer(inference_engine, state.restaurant_data))
+
+    def refresh_if_changed(self):
+        """
+        Reloads the CSV if it changed on disk and re-runs inference if the rule file changed. Called on every
+        lookup, so the files are only checked once per refresh_interval. A CSV that cannot be loaded (e.g.
+        while it is being rewritten) keeps the current table until the next check.
+        """
+        if time.monotonic() < self.next_refresh:
+            return
+        with self._refresh_lock:
+            if time.monotonic() < self.next_refresh:
+                return  # Another thread just checked
+            state = self.state
+            rule_set = self.changed_rules()
+            inference_engine = state.inference_engine if rule_set is None else InferenceEngine(rule_set)
+            refreshed = None
+            try:
+                if self._stat(self.csv_path) != state.csv_stat:
+                    refreshed = self._load(inference_engine, state.rules_version + (rule_set is not None))
+            except (OSError, ValueError, KeyError) as error:
+                print(f"DEBUG: Keeping the current restaurant table, {self.csv_path} could not be loaded: {error!r}")
+            if refreshed is None and rule_set is not None:
+                refreshed = self._with_rules(state, inference_engine)
+            if refreshed is not None:
+                self.state = refreshed
+            self.next_refresh = time.monotonic() + self.refresh_interval
+
+    @staticmethod
+    def _infer(inference_engine: InferenceEngine, restaurant_data: pd.DataFrame) -> BatchInference:
+        """
+        Runs batch inference once per distinct combination of the input columns and spreads the results over
+        the rows, as one column per inferred property for vectorized filtering.
+
+        :return: The BatchInference over all rows
+        """
+        inputs = restaurant_data[INFERENCE_COLUMNS]
+        codes = np.column_stack([pd.factorize(inputs[column])[0] for column in INFERENCE_COLUMNS])
+        _, first, rows = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+        distinct = inference_engine.batch_inference(inputs.iloc[first])
+        inference_results = distinct.take(rows.ravel(), restaurant_data.index)
+        print(f"DEBUG: Inferred properties for {len(restaurant_data)} restaurants from {len(first)} distinct inputs")
+        return inference_results
+
+    @staticmethod
+    def normalize_preferences(preferences: dict) -> tuple:
+        """One value per slot, lowercased; missing values and 'any' both become None."""
+        values = []
+        for slot in SLOT_COLUMNS:
+            value = preferences.get(slot)
+            value = value.lower() if value else None
+            values.append(None if value in (None, '', 'any') else value)
+        return tuple(values)
+
+    def candidate_positions(self, preferences: dict, state: LookupState = None) -> np.ndarray:
+        """
+        Read-only row positions of the restaurants matching the preferences, cached per normalized preference
+        tuple. The positions index the table of `state` (by default the current state).
+        """
+        if state is None:
+            state = self.state
+        key = self.normalize_preferences(preferences)
+        cache = state.candidate_cache
+        with self._cache_lock:
+            if key in cache:
+                cache.move_to_end(key)
+                self.cache_hits += 1
+                return cache[key]
+            self.cache_misses += 1
+        positions = state.index.positions(dict(zip(SLOT_COLUMNS, key)))
+        positions.flags.writeable = False
+        with self._cache_lock:
+            cache[key] = positions
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return positions
+
+    def cache_stats(self) -> dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'size': len(self.state.candidate_cache),
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+        }
 
     def get_candidates(self, preferences: dict):
         print(f"DEBUG: Getting candidates for preferences: {preferences}")
-        filtered_data = self.restaurant_data.copy()
-        print(f"DEBUG: Total restaurants before filtering: {len(filtered_data)}")
-        
-        filtered_data = self._filter_by_price(
-            filtered_data, preferences.get('price_range'))
-        print(f"DEBUG: Restaurants after price filter: {len(filtered_data)}")
-        
-        filtered_data = self._filter_by_location(
-            filtered_data, preferences.get('location'))
-        print(f"DEBUG: Restaurants after location filter: {len(filtered_data)}")
-        
-        filtered_data = self._filter_by_food_type(
-            filtered_data, preferences.get('food_type'))
-        print(f"DEBUG: Restaurants after food type filter: {len(filtered_data)}")
-
-        if filtered_data.empty:
+        self.refresh_if_changed()
+        state = self.state
+        positions = self.candidate_positions(preferences, state)
+        print(f"DEBUG: Restaurants after filtering: {len(positions)} of {len(state.restaurant_data)}")
+
+        if len(positions) == 0:
             return pd.DataFrame()  # Return empty DataFrame if no candidates found
 
-        return filtered_data
+        return state.restaurant_data.iloc[positions]
+
+    def _requirement_met(self, state: LookupState, req_property: str, req_value) -> np.ndarray:
+        """
+        Read-only boolean mask of the rows whose inferred property has the required value. The inference
+        engine back-chains the requirement to a condition on the input columns, which is evaluated with the
+        index's cached column masks; if the rules do not allow that, the inferred property table is compared.
+        """
+        key = (req_property, req_value)
+        masks = state.requirement_masks
+        met = masks.get(key)
+        if met is None:
+            if req_property not in state.inferred_table or req_value == 'contradictory':
+                # Contradictory or missing properties never meet a requirement
+                met = np.zeros(len(state.restaurant_data), dtype=bool)
+            else:
+                condition = state.inference_engine.requirement_condition(req_property, req_value, INFERENCE_COLUMNS)
+                if condition is None:
+                    met = (state.inferred_table[req_property] == req_value).to_numpy(dtype=bool)
+                else:
+                    met = self._condition_mask(state, condition)
+            met.flags.writeable = False
+            masks[key] = met
+        return met
+
+    def _condition_mask(self, state: LookupState, condition) -> np.ndarray:
+        """Evaluates a condition from InferenceEngine.requirement_condition over the restaurant table."""
+        if isinstance(condition, bool):
+            return np.full(len(state.restaurant_data), condition)
+        if condition[0] == 'is':
+            return state.index.equals(condition[1], condition[2])
+        if condition[0] == 'not':
+            return ~self._condition_mask(state, condition[1])
+        masks = [self._condition_mask(state, item) for item in condition[1]]
+        if condition[0] == 'all':
+            return np.logical_and.reduce(masks)
+        return np.logical_or.reduce(masks)
+
+    def _requirement_mask(self, state: LookupState, additional_requirements: dict) -> np.ndarray:
+        """Boolean mask of the rows whose inferred properties meet every requirement."""
+        meets_requirements = np.ones(len(state.restaurant_data), dtype=bool)
+        for req_property, req_value in additional_requirements.items():
+            meets_requirements &= self._requirement_met(state, req_property, req_value)
+        return meets_requirements
+
+    def matching_restaurants(self, candidates: pd.DataFrame, additional_requirements: dict,
+                             state: LookupState = None) -> pd.Index:
+        """Index labels of the candidates whose precomputed inferred properties meet every requirement."""
+        if state is None:
+            state = self.state
+        positions = state.restaurant_data.index.get_indexer(candidates.index)
+        meets_requirements = (positions >= 0) & self._requirement_mask(state, additional_requirements)[positions]
+        return candidates.index[meets_requirements]
+
+    def selection(self, label, state: LookupState = None) -> dict:
+        """
+        The selected restaurant with its inferred properties and explanations. Labels from an earlier call
+        must be resolved with the state that call read (by default the current state).
+        """
+        if state is None:
+            state = self.state
+        restaurant = state.restaurant_data.loc[label].copy()
+        inferred_properties, explanations = state.inference_results.row(state.restaurant_data.index.get_loc(label))
+        # Store both inferred facts and explanations
+        restaurant['inferred'] = inferred_properties
+        restaurant['explanations'] = explanations
+        print(f"DEBUG: Selected restaurant: {restaurant['restaurantname']}")
+        return {
+            'restaurant': restaurant,
+            'inferred': inferred_properties,
+            'explanations': explanations
+        }
 
     def apply_inference_and_select(self, candidates: pd.DataFrame, additional_requirements: dict):
         print(f"DEBUG: Applying inference and selecting from {len(candidates)} candidates")
@@ -42,51 +330,143 @@ class RestaurantLookup:
         if candidates.empty:
             return "No matching restaurants found"
 
-        matching_restaurants = []
-        for _, restaurant in candidates.iterrows():
-            # Create literals for known properties
-            known_properties = [
-                Literal('pricerange', restaurant['pricerange']),
-                Literal('food_quality', restaurant['food_quality']),
-                Literal('food', restaurant['food']),
-                Literal('crowdedness', restaurant['crowdedness']),
-                Literal('length_of_stay', restaurant['length_of_stay']),
-            ]
-
-            # Apply inference engine and unpack the results
-            inferred, explanations = self.inference_engine.inference(
-                known_properties)
-            print(f"DEBUG: Restaurant: {restaurant['restaurantname']}")
-            print(f"DEBUG: Inferred properties: {inferred}")
-
-            # Check if restaurant meets additional requirements
-            meets_requirements = True
-            for req_property, req_value in additional_requirements.items():
-                inferred_value = inferred.get(req_property)
-                if inferred_value == 'contradictory' or inferred_value != req_value:
-                    meets_requirements = False
-                    print(f"DEBUG: Restaurant doesn't meet requirement: {req_property}={req_value}")
-                    break
-
-            if meets_requirements:
-                # Store both inferred facts and explanations
-                restaurant['inferred'] = inferred
-                restaurant['explanations'] = explanations
-                matching_restaurants.append(restaurant)
-
-        print(f"DEBUG: Number of matching restaurants: {len(matching_restaurants)}")
-
-        if not matching_restaurants:
+        self.refresh_if_changed()
+        state = self.state
+        matching = self.matching_restaurants(candidates, additional_requirements, state)
+
+        print(f"DEBUG: Number of matching restaurants: {len(matching)}")
+
+        if len(matching) == 0:
             return "No matching restaurants found with your additional requirements"
 
-        # Randomly select a restaurant from the matching ones
-        selected_restaurant = random.choice(matching_restaurants)
-        print(f"DEBUG: Selected restaurant: {selected_restaurant['restaurantname']}")
-        return {
-            'restaurant': selected_restaurant,
-            'inferred': selected_restaurant['inferred'],
-            'explanations': selected_restaurant['explanations']
-        }
+        # Select the best scored of the matching restaurants
+        positions = state.restaurant_data.index.get_indexer(matching)
+        scores = self._scores(state, {}, additional_requirements)[positions]
+        return self.selection(matching[np.argmax(scores)], state)
+
+    def select_restaurant(self, preferences: dict, additional_requirements: dict):
+        """
+        Like get_candidates followed by apply_inference_and_select, but the requirements are applied as row
+        masks together with the preferences, and inference results are only read for the selected restaurant.
+        """
+        self.refresh_if_changed()
+        state = self.state
+        positions = self.candidate_positions(preferences, state)
+        print(f"DEBUG: Restaurants after filtering: {len(positions)} of {len(state.restaurant_data)}")
+        if len(positions) == 0:
+            return "No matching restaurants found"
+
+        for req_property, req_value in additional_requirements.items():
+            positions = positions[self._requirement_met(state, req_property, req_value)[positions]]
+        print(f"DEBUG: Number of matching restaurants: {len(positions)}")
+        if len(positions) == 0:
+            return "No matching restaurants found with your additional requirements"
+
+        # The matches meet every preference and requirement, so only the static part of their scores differs
+        label = state.restaurant_data.index[positions[np.argmax(state.static_scores[positions])]]
+        return self.selection(label, state)
+
+    def _requirement_scores(self, state: LookupState, additional_requirements: dict) -> np.ndarray:
+        """Share of the additional requirements each restaurant meets."""
+        if not additional_requirements:
+            return np.ones(len(state.restaurant_data))
+        met = np.zeros(len(state.restaurant_data))
+        for req_property, req_value in additional_requirements.items():
+            met += self._requirement_met(state, req_property, req_value)
+        return met / len(additional_requirements)
+
+    def _satisfied_preferences(self, state: LookupState, preferences: dict) -> np.ndarray:
+        """satisfies[row, slot]: the restaurant meets that primary preference (or there is none)."""
+        satisfies = np.ones((len(state.restaurant_data), len(SLOT_COLUMNS)), dtype=bool)
+        for j, slot in enumerate(SLOT_COLUMNS):
+            mask = state.index.mask(slot, preferences.get(slot))
+            if mask is not None:
+                satisfies[:, j] = mask
+        return satisfies
+
+    def score_restaurants(self, preferences: dict, additional_requirements: dict) -> np.ndarray:
+        """Recommendation score of every restaurant of the current state, weighted by SCORE_WEIGHTS; higher is better."""
+        return self._scores(self.state, preferences, additional_requirements)
+
+    def _scores(self, state: LookupState, preferences: dict, additional_requirements: dict, satisfies=None) -> np.ndarray:
+        if satisfies is None:
+            satisfies = self._satisfied_preferences(state, preferences)
+        slot_weights = np.array([SCORE_WEIGHTS[slot] for slot in SLOT_COLUMNS])
+        return (
+            satisfies @ slot_weights
+            + SCORE_WEIGHTS['requirements'] * self._requirement_scores(state, additional_requirements)
+            + state.static_scores
+        )
+
+    def _relaxation_matches(self, state: LookupState, preferences: dict, additional_requirements: dict, exclude=()) -> tuple:
+        """
+        Scores every restaurant against all of PREFERENCE_COMBINATIONS at once.
+
+        :return: matches[row, k] (the restaurant meets every preference kept in combination k and is not excluded),
+                 the same restricted to restaurants meeting the additional requirements, and the scores
+        """
+        satisfies = self._satisfied_preferences(state, preferences)
+        combinations = np.array([[slot in combination for slot in SLOT_COLUMNS] for combination in PREFERENCE_COMBINATIONS])
+        matches = ~((~satisfies)[:, None, :] & combinations[None, :, :]).any(axis=2)
+        matches &= ~state.restaurant_data['restaurantname'].isin(list(exclude)).to_numpy()[:, None]
+        meets_requirements = matches & self._requirement_mask(state, additional_requirements)[:, None]
+        return matches, meets_requirements, self._scores(state, preferences, additional_requirements, satisfies)
+
+    def plan_relaxation(self, preferences: dict, additional_requirements: dict, exclude=(), drop_requirements=True) -> dict:
+        """
+        Finds the strictest combination of primary preferences (see PREFERENCE_COMBINATIONS) that some
+        restaurant meets, and selects the best scored restaurant meeting it.
+
+        A restaurant qualifies for a combination when it matches those preferences, is not named in `exclude`
+        and meets the additional requirements. With drop_requirements, the first combination with any matching
+        restaurant is used, and the requirements are dropped if none of its restaurants meet them.
+
+        :return: Dict with the selected restaurant (as returned by apply_inference_and_select, or None),
+                 the combination it matched, the requirements it meets and the combinations relaxed before it
+        """
+        self.refresh_if_changed()
+        state = self.state
+        matches, meets_requirements, scores = self._relaxation_matches(state, preferences, additional_requirements, exclude)
+        if drop_requirements:
+            found = matches.any(axis=0)
+        else:
+            found = meets_requirements.any(axis=0)
+        plan = {'selected': None, 'combination': None, 'requirements': additional_requirements, 'relaxed': []}
+        for k, combination in enumerate(PREFERENCE_COMBINATIONS):
+            if not found[k]:
+                plan['relaxed'].append(combination)
+                continue
+            rows = np.flatnonzero(meets_requirements[:, k])
+            if len(rows) == 0:
+                # Only reached with drop_requirements
+                rows = np.flatnonzero(matches[:, k])
+                plan['requirements'] = {}
+            print(f"DEBUG: Relaxation kept {combination}: {len(rows)} matching restaurants")
+            plan['selected'] = self.selection(state.restaurant_data.index[rows[np.argmax(scores[rows])]], state)
+            plan['combination'] = combination
+            break
+        return plan
+
+    def rank_restaurants(self, preferences: dict, additional_requirements: dict, exclude=(), top_k: int = 20,
+                         state: LookupState = None) -> list:
+        """
+        The top_k restaurants meeting the additional requirements, in the order plan_relaxation with
+        drop_requirements=False would suggest them if each one were excluded in turn: by the strictest
+        preference combination they meet, then by score.
+
+        :param state: The state to rank (by default the current one, refreshed first); pass the same state to
+                      selection to resolve the labels
+        :return: List of (index label, index of the combination in PREFERENCE_COMBINATIONS) pairs
+        """
+        if state is None:
+            self.refresh_if_changed()
+            state = self.state
+        _, meets_requirements, scores = self._relaxation_matches(state, preferences, additional_requirements, exclude)
+        eligible = np.flatnonzero(meets_requirements.any(axis=1))
+        levels = meets_requirements[eligible].argmax(axis=1)
+        # lexsort sorts by the last key first; equal scores keep table order
+        order = np.lexsort((eligible, -scores[eligible], levels))[:top_k]
+        return [(state.restaurant_data.index[eligible[i]], int(levels[i])) for i in order]
 
     def generate_reasoning(self, selected_restaurant_data: dict, additional_requirements: dict) -> str:
         reasoning = []
@@ -129,22 +509,3 @@ class RestaurantLookup:
             reasoning_str = reasoning[0] if reasoning else ""
 
         return reasoning_str.capitalize() + "."
-
-    # Filtering methods
-    def _filter_by_price(self, data: pd.DataFrame, price_range: str) -> pd.DataFrame:
-        if price_range and price_range.lower() != 'any':
-            return data[data['pricerange'].str.lower().str.contains(price_range.lower(), na=False)]
-        return data
-
-    def _filter_by_location(self, data: pd.DataFrame, location: str) -> pd.DataFrame:
-        if location and location.lower() != 'any':
-            return data[data['area'].str.lower().str.contains(location.lower(), na=False)]
-        return data
-
-    def _filter_by_food_type(self, data: pd.DataFrame, food_type: str) -> pd.DataFrame:
-        if food_type and food_type.lower() != 'any':
-            food_types = food_type.split(
-                '|') if '|' in food_type else [food_type]
-            pattern = '|'.join(food_types)
-            return data[data['food'].str.lower().str.contains(pattern, na=False)]
-        return data
@@ -0,0 +1,38 @@
+# assignment_1b/phrase_index.py
+
+from itertools import islice
+from assignment_1b.tokenizer import tokenize
+
+# Marks the end of a phrase in the trie
+_END = None
+
+
+class PhraseIndex:
+    """
+    A trie over token sequences. Each phrase is stored with the slot it fills, a rank and a value;
+    a single pass over the tokens of an utterance finds every phrase that occurs on token boundaries
+    and keeps, per slot, the value with the lowest rank.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, phrase: str, slot: str, rank: tuple, value):
+        node = self.root
+        for token in tokenize(phrase):
+            node = node.setdefault(token, {})
+        node.setdefault(_END, []).append((slot, rank, value))
+
+    def match(self, tokens: list) -> dict:
+        """Returns {slot: value} for the best ranked phrase of every slot found in the tokens."""
+        best = {}
+        for start in range(len(tokens)):
+            node = self.root
+            for token in islice(tokens, start, None):
+                node = node.get(token)
+                if node is None:
+                    break
+                for slot, rank, value in node.get(_END, ()):
+                    if slot not in best or rank < best[slot][0]:
+                        best[slot] = (rank, value)
+        return {slot: value for slot, (rank, value) in best.items()}
@@ -0,0 +1,84 @@
+# assignment_1b/restaurant_index.py
+
+import numpy as np
+import pandas as pd
+
+# Preference slot -> restaurant table column
+SLOT_COLUMNS = {
+    'price_range': 'pricerange',
+    'location': 'area',
+    'food_type': 'food',
+}
+
+# Distinct preference values whose masks are kept; the cache is cleared when it fills up
+MAX_CACHED_MASKS = 1024
+
+
+class RestaurantIndex:
+    """
+    Categorical codes for the price range, area and food columns, built once when the table is loaded.
+
+    A preference value is resolved against the distinct values of its column (a value matches when one of
+    its `|`-separated alternatives is a substring of it, as str.contains did), then turned into a boolean
+    row mask. Candidates are the intersection of the masks, so no lookup copies or scans the table's strings.
+    Exact equality masks over any column serve conditions derived from the inference rules.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self.size = len(data)
+        self.codes = {}
+        self.values = {}
+        for column in SLOT_COLUMNS.values():
+            # Missing values get code -1 and never match
+            codes, uniques = pd.factorize(data[column].str.lower())
+            self.codes[column] = codes
+            self.values[column] = list(uniques)
+        self._masks = {}
+        # Column -> codes and distinct values, compared as they are, factorized on first use
+        self._exact_codes = {}
+
+    def mask(self, slot: str, value: str):
+        """Boolean mask of the rows matching one preference, or None if the preference does not constrain the slot."""
+        if not value or value.lower() == 'any':
+            return None
+        column = SLOT_COLUMNS[slot]
+        key = (column, value.lower())
+        # Read once: another thread may clear the cache between a membership test and the lookup
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) >= MAX_CACHED_MASKS:
+                self._masks.clear()
+            alternatives = value.lower().split('|')
+            matching = [
+                code for code, candidate in enumerate(self.values[column])
+                if any(alternative in candidate for alternative in alternatives)
+            ]
+            mask = np.isin(self.codes[column], matching)
+            mask.flags.writeable = False
+            self._masks[key] = mask
+        return mask
+
+    def equals(self, column: str, value) -> np.ndarray:
+        """Read-only boolean mask of the rows whose column equals the value, compared with == as inference does."""
+        key = ('=', column, value)
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) >= MAX_CACHED_MASKS:
+                self._masks.clear()
+            if column not in self._exact_codes:
+                self._exact_codes[column] = pd.factorize(self.data[column])
+            codes, uniques = self._exact_codes[column]
+            mask = np.isin(codes, [code for code, candidate in enumerate(uniques) if candidate == value])
+            mask.flags.writeable = False
+            self._masks[key] = mask
+        return mask
+
+    def positions(self, preferences: dict) -> np.ndarray:
+        """Row positions of the restaurants matching every preference."""
+        mask = None
+        for slot in SLOT_COLUMNS:
+            slot_mask = self.mask(slot, preferences.get(slot))
+            if slot_mask is not None:
+                mask = slot_mask if mask is None else mask & slot_mask
+        return np.arange(self.size) if mask is None else np.flatnonzero(mask)
@@ -0,0 +1,189 @@
+# assignment_1b/restaurant_store.py
+# A columnar copy of the restaurant CSV. String columns are stored as integer codes plus their categories,
+# one .npy file per column, so dialogue processes memory-map the same pages instead of each parsing the CSV.
+#
+# Layout next to the CSV (restaurant_info_extended.csv -> restaurant_info_extended.store/):
+#   CURRENT            name of the published version, replaced atomically
+#   <version>/meta.json  columns, categories, row count and the source file it was built from
+#   <version>/<column>.npy
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; concurrent rebuilds are then not serialized
+    fcntl = None
+
+
+def store_dir_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".store"
+
+
+def source_stat(csv_path: str) -> list:
+    stat = os.stat(csv_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def source_digest(csv_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def smallest_code_dtype(size: int):
+    """Codes range from -1 (missing) to size - 1."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class RestaurantStore:
+    """One published version of the store, with its columns memory-mapped read-only."""
+
+    def __init__(self, store_dir: str, version: str):
+        self.store_dir = store_dir
+        self.version = version
+        path = os.path.join(store_dir, version)
+        with open(os.path.join(path, "meta.json"), encoding='utf-8') as file:
+            self.meta = json.load(file)
+        self.columns = {
+            column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+            for column in self.meta['columns']
+        }
+
+    def __len__(self):
+        return self.meta['rows']
+
+    @property
+    def categories(self) -> dict:
+        return self.meta['categories']
+
+    def to_frame(self) -> pd.DataFrame:
+        """The restaurant table with categorical columns backed by the stored codes."""
+        data = {}
+        for column, values in self.columns.items():
+            if column in self.categories:
+                data[column] = pd.Categorical.from_codes(values, categories=self.categories[column])
+            else:
+                data[column] = values
+        return pd.DataFrame(data)
+
+
+def build_store(csv_path: str, store_dir: str = None, digest: str = None) -> str:
+    """Converts the CSV into a new version of the store and publishes it; returns the version."""
+    store_dir = store_dir or store_dir_for(csv_path)
+    stat = source_stat(csv_path)
+    digest = digest or source_digest(csv_path)
+    version = digest[:16]
+    data = pd.read_csv(csv_path)
+
+    os.makedirs(store_dir, exist_ok=True)
+    temporary_dir = os.path.join(store_dir, f".{version}.{os.getpid()}.tmp")
+    shutil.rmtree(temporary_dir, ignore_errors=True)
+    os.makedirs(temporary_dir)
+    categories = {}
+    for column in data.columns:
+        values = data[column]
+        if values.dtype == object:
+            codes, uniques = pd.factorize(values)
+            categories[column] = list(uniques)
+            values = codes.astype(smallest_code_dtype(len(uniques)))
+        np.save(os.path.join(temporary_dir, f"{column}.npy"), np.asarray(values))
+    meta = {
+        'columns': list(data.columns),
+        'categories': categories,
+        'rows': len(data),
+        'source': {'path': os.path.abspath(csv_path), 'stat': stat, 'sha256': digest},
+    }
+    with open(os.path.join(temporary_dir, "meta.json"), 'w', encoding='utf-8') as file:
+        json.dump(meta, file, indent=2)
+
+    version_dir = os.path.join(store_dir, version)
+    if os.path.isdir(version_dir):
+        # The same contents were built before; other processes may have that version open, so keep it
+        shutil.rmtree(temporary_dir)
+        _record_stat(store_dir, version, stat)
+    else:
+        os.rename(temporary_dir, version_dir)
+    _publish(store_dir, version)
+    return version
+
+
+def _record_stat(store_dir: str, version: str, stat: list):
+    """Updates the source modification time and size of a version whose contents are unchanged."""
+    meta_path = os.path.join(store_dir, version, "meta.json")
+    with open(meta_path, encoding='utf-8') as file:
+        meta = json.load(file)
+    meta['source']['stat'] = stat
+    temporary_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump(meta, file, indent=2)
+    os.replace(temporary_path, meta_path)
+
+
+def _publish(store_dir: str, version: str):
+    """Points CURRENT at the version atomically, then removes versions older than the previous one."""
+    current_path = os.path.join(store_dir, "CURRENT")
+    previous = read_current(store_dir)
+    temporary_path = f"{current_path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        file.write(version)
+    os.replace(temporary_path, current_path)
+    # Processes that opened the previous version keep working from it until they reload
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if os.path.isdir(path) and not name.startswith('.') and name not in (version, previous):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def read_current(store_dir: str):
+    try:
+        with open(os.path.join(store_dir, "CURRENT"), encoding='utf-8') as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _is_fresh(store_dir: str, version: str, csv_path: str, digest: str = None) -> bool:
+    try:
+        with open(os.path.join(store_dir, version, "meta.json"), encoding='utf-8') as file:
+            source = json.load(file)['source']
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return False
+    if digest is not None:
+        return source['sha256'] == digest
+    return source['stat'] == source_stat(csv_path)
+
+
+def load_store(csv_path: str, store_dir: str = None) -> RestaurantStore:
+    """
+    Opens the current version of the store for the CSV, building it first if the CSV changed since.
+    Rebuilds are serialized with a lock, so processes reloading at the same time build it only once.
+    """
+    store_dir = store_dir or store_dir_for(csv_path)
+    version = read_current(store_dir)
+    if version is not None and _is_fresh(store_dir, version, csv_path):
+        return RestaurantStore(store_dir, version)
+
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, "build.lock"), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        # Another process may have published a fresh version while this one waited for the lock
+        version = read_current(store_dir)
+        if version is None or not _is_fresh(store_dir, version, csv_path):
+            digest = source_digest(csv_path)
+            if version is not None and _is_fresh(store_dir, version, csv_path, digest):
+                # Only the modification time changed; record it so the digest is not recomputed next time
+                _record_stat(store_dir, version, source_stat(csv_path))
+            else:
+                version = build_store(csv_path, store_dir, digest)
+    return RestaurantStore(store_dir, version)
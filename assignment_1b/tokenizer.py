@@ -0,0 +1,23 @@
+# assignment_1b/tokenizer.py
+
+import os
+import re
+from functools import lru_cache
+
+# Words, optionally joined by an apostrophe or hyphen ("don't", "low-cost", "mid-range")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['’-][a-z0-9]+)*")
+
+# NLTK's English stopword list, bundled so nothing has to be downloaded
+stop_words_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "stopwords_english.txt")
+
+
+def tokenize(text: str) -> list:
+    """Splits lowercased text into word tokens; phrases and user input are tokenized the same way."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+@lru_cache(maxsize=None)
+def stop_words(path=stop_words_path) -> frozenset:
+    """The English stopwords, read on first use."""
+    with open(path, encoding='utf-8') as file:
+        return frozenset(line.strip() for line in file if line.strip())
@@ -28,14 +28,20 @@ class State:
 class TransitionManager:
     """Manages the state transitions and keeps track of the current state."""
 
-    def __init__(self, states, initial_state):
+    def __init__(self, states, initial_state, output=None):
+        """
+        :param output: Callable receiving every system message of the session. By default messages are printed
+                       and, if enabled in the config, spoken.
+        """
         self.states = {state.name: state for state in states}
         self.current_state = initial_state
         self.preferences = {}
         self.additional_requirements = {}
         self.candidate_restaurants = None
         self.dead = False
-        self.tts_engine = pyttsx3.init()
+        self.output = output
+        # Only start the speech engine when it will actually be used
+        self.tts_engine = pyttsx3.init() if assignment_1c.config.text_to_speech and output is None else None
         self.pending_pref_key = None
         self.pending_pref_value = None
         print(f"DEBUG: TransitionManager initialized with initial state: {initial_state.name}")
@@ -50,13 +56,20 @@ class TransitionManager:
         else:
             print(f"DEBUG: Error - State {state_name} not found")
 
-    def speak(self):
-        print(f"DEBUG: Speaking prompt for state: {self.current_state.name}")
-        print(self.current_state.prompt)
+    def say(self, message: str):
+        """Delivers a system message to the user."""
+        if self.output is not None:
+            self.output(message)
+            return
+        print(message)
         if assignment_1c.config.text_to_speech:
-            self.tts_engine.say(self.current_state.prompt)
+            self.tts_engine.say(message)
             self.tts_engine.runAndWait()
 
+    def speak(self):
+        print(f"DEBUG: Speaking prompt for state: {self.current_state.name}")
+        self.say(self.current_state.prompt)
+
     def update_preferences(self, key, value):
         print(f"DEBUG: Updating preferences - {key}: {value}")
         self.preferences[key] = value
@@ -69,10 +82,7 @@ class TransitionManager:
             clarification = "I'm sorry, I didn't understand that. Could you please clarify?"
             if assignment_1c.config.all_caps:
                 clarification = clarification.upper()
-            print(clarification)
-            if assignment_1c.config.text_to_speech:
-                self.tts_engine.say(clarification)
-                self.tts_engine.runAndWait()
+            self.say(clarification)
             return False
         conditions, new_state = self.current_state.transitions[dialogue_act]
 
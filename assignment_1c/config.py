@@ -17,3 +17,27 @@ use_formal_language = True
 allow_preference_change = True
 
 text_to_speech = False
+
+# Number of normalized user utterances whose dialogue act is cached
+prediction_cache_size = 4096
+
+# Pre-fill the prediction cache with this many of the most frequent sentences in dialog_acts.dat (0 to disable)
+prediction_cache_prewarm = 1000
+
+# Number of distinct (price range, area, food type) preferences whose candidate restaurants are cached
+candidate_cache_size = 1024
+
+# Number of ranked alternatives fetched at once; further alternatives are paged from this list
+ranking_page_size = 20
+
+# Seconds between checks whether the restaurant CSV or the rule file changed on disk (0 checks on every lookup)
+refresh_interval = 1.0
+
+# Dialogue server (python main.py --serve)
+server_host = "127.0.0.1"
+server_port = 8080
+# Threads running the dialogue turns of all sessions
+server_workers = 4
+# Sessions kept at once, and seconds after which an idle session is ended
+max_sessions = 1000
+session_timeout = 1800
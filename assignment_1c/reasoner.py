@@ -1,102 +1,290 @@
+import heapq
+import numpy as np
+import pandas as pd
 from typing import List, Dict
+from assignment_1c.rule_set import Literal, Rule, RuleSet
 
 
-class Literal:
-    def __init__(self, name: str, truth_value):
-        self.name = name
-        self.truth_value = truth_value
+class BatchInference:
+    """
+    Inference results for every row of a table, one column per consequent of the rules.
 
-    def __eq__(self, other):
-        return self.name == other.name and self.truth_value == other.truth_value
+    inferred holds the inferred value (or 'contradictory'), NaN where nothing was inferred; contradictory marks
+    the contradictions; explanation_rules holds the position of the rule explaining the value, -1 for
+    contradictions; order holds the step at which the property was first inferred, -1 where it was not.
+    """
 
-    def __repr__(self):
-        return f"{self.name} = {self.truth_value}"
+    def __init__(self, rules: List[Rule], inferred: pd.DataFrame, explanation_rules: pd.DataFrame, order: pd.DataFrame):
+        self.rules = rules
+        self.inferred = inferred
+        self.contradictory = inferred == 'contradictory'
+        self.explanation_rules = explanation_rules
+        self.order = order
 
+    def __len__(self):
+        return len(self.inferred)
 
-class Rule:
-    """Rules are in conjunctive normal form: (p ∧ ... ∧ q -> c)"""
+    def take(self, positions: np.ndarray, index: pd.Index = None) -> 'BatchInference':
+        """The results of the rows at the positions, relabelled with index."""
+        frames = []
+        for frame in (self.inferred, self.explanation_rules, self.order):
+            frame = frame.iloc[positions]
+            if index is not None:
+                frame.index = index
+            frames.append(frame)
+        return BatchInference(self.rules, *frames)
 
-    def __init__(self, antecedents: Dict[str, any], consequent: str, consequent_value, explanation: str):
-        self.antecedents = antecedents  # Dict of property names and their expected values
-        self.consequent = consequent
-        self.consequent_value = consequent_value
-        self.explanation = explanation  # Explanation string
+    def row(self, position: int) -> (Dict[str, any], Dict[str, str]):
+        """The (inferred, explanations) pair of one row, as InferenceEngine.inference returns it."""
+        inferred = {}
+        explanations = {}
+        order = self.order.iloc[position]
+        for prop in order[order >= 0].sort_values(kind='stable').index:
+            inferred[prop] = self.inferred.iloc[position][prop]
+            rule = self.explanation_rules.iloc[position][prop]
+            if rule < 0:
+                explanations[prop] = f"Contradiction detected for {prop}"
+            else:
+                explanations[prop] = self.rules[rule].explanation
+        return inferred, explanations
 
 
 class InferenceEngine:
-    def __init__(self, rules: List[Rule]):
-        self.rules = rules
+    """
+    Forward chaining over a compiled RuleSet with an agenda. Rules are indexed by their coded antecedents, so
+    learning a fact only touches the rules that test that property, and a rule is only evaluated when all of
+    its antecedents hold. A rule fires at most once (afterwards its consequent holds its value or is
+    contradictory).
+
+    The results are the same as sweeping over all rules in file order until a sweep infers nothing new: ready
+    rules fire in the order such a sweep would reach them. When the file order already is an evaluation order
+    (RuleSet.ordered: every rule comes after the rules deriving what it reads), one sweep infers everything.
+    """
+
+    def __init__(self, rule_set: RuleSet):
+        self.rule_set = rule_set
+        self.rules = rule_set.rules
+        self.ordered = rule_set.ordered
+        self.property_indices = {name: i for i, name in enumerate(rule_set.properties)}
+        self.codes = dict(rule_set.codes)
+        self.contradictory = self.codes.setdefault('contradictory', len(self.codes))
+        self.none = self.codes.setdefault(None, len(self.codes))
+        # (property index, value code) -> positions of the rules with that antecedent
+        self.index = {}
+        for position, conditions in enumerate(rule_set.conditions):
+            for condition in conditions:
+                self.index.setdefault(condition, []).append(position)
+        self.sizes = [len(conditions) for conditions in rule_set.conditions]
+        self.conclusions = rule_set.conclusions
+        self.unconditional = [position for position, size in enumerate(self.sizes) if size == 0]
+        # An antecedent expecting None holds while the property is unknown
+        self.none_properties = [prop for prop, value in self.index if value == self.none]
 
     def inference(self, knowledge: List[Literal]) -> (Dict[str, any], Dict[str, str]):
         inferred = {}
         explanations = {}
-        known = {lit.name: lit.truth_value for lit in knowledge}
-        contradictions = {}
-
-        while True:
-            new_inference = False
-            for r in self.rules:
-                # Check if all antecedents are satisfied
-                antecedents_satisfied = all(
-                    known.get(ant) == val for ant, val in r.antecedents.items()
-                )
-                if antecedents_satisfied:
-                    if r.consequent not in known:
-                        # Infer the consequent
-                        known[r.consequent] = r.consequent_value
-                        inferred[r.consequent] = r.consequent_value
-                        # Record explanation
-                        explanations[r.consequent] = r.explanation
-                        new_inference = True
-                    else:
-                        # Check for contradiction
-                        if known[r.consequent] != r.consequent_value and known[r.consequent] != 'contradictory':
-                            known[r.consequent] = 'contradictory'
-                            inferred[r.consequent] = 'contradictory'
-                            explanations[r.consequent] = f"Contradiction detected for {r.consequent}"
-                            contradictions[r.consequent] = True
-                            new_inference = True
-            if not new_inference:
-                break
+        rules, index, sizes, conclusions = self.rules, self.index, self.sizes, self.conclusions
+        contradictory = self.contradictory
+        # Value codes per property index; values no rule mentions equal nothing the rules test or derive
+        known = {}
+        for lit in knowledge:
+            prop = self.property_indices.get(lit.name)
+            if prop is not None:
+                known[prop] = self.codes.get(lit.truth_value, -1)
+
+        satisfied = {}
+        # Rules that will fire in the current sweep (past the cursor) and in the next one
+        agenda = list(self.unconditional)
+        next_agenda = []
+        cursor = -1
+
+        def activate(prop, value):
+            for position in index.get((prop, value), ()):
+                count = satisfied.get(position, 0) + 1
+                satisfied[position] = count
+                if count == sizes[position]:
+                    heapq.heappush(agenda if position > cursor else next_agenda, position)
+
+        def deactivate(prop, value):
+            for position in index.get((prop, value), ()):
+                satisfied[position] -= 1
+
+        for prop, value in known.items():
+            activate(prop, value)
+        for prop in self.none_properties:
+            if prop not in known:
+                activate(prop, self.none)
+        heapq.heapify(agenda)
+
+        while agenda or next_agenda:
+            if not agenda:
+                # Start the next sweep; never needed when the rules are ordered
+                agenda, next_agenda, cursor = next_agenda, [], -1
+            position = heapq.heappop(agenda)
+            if position <= cursor or satisfied.get(position, 0) != sizes[position]:
+                continue  # Already fired in this sweep, or an antecedent became contradictory
+            cursor = position
+            r = rules[position]
+            prop, value = conclusions[position]
+            if prop not in known:
+                # Infer the consequent
+                known[prop] = value
+                inferred[r.consequent] = r.consequent_value
+                # Record explanation
+                explanations[r.consequent] = r.explanation
+                deactivate(prop, self.none)
+                activate(prop, value)
+            elif known[prop] != value and known[prop] != contradictory:
+                # Contradiction
+                current = known[prop]
+                known[prop] = contradictory
+                inferred[r.consequent] = 'contradictory'
+                explanations[r.consequent] = f"Contradiction detected for {r.consequent}"
+                deactivate(prop, current)
+                activate(prop, contradictory)
         return inferred, explanations
 
+    def requirement_condition(self, prop: str, value, base_properties):
+        """
+        Back-chains a requirement to the base properties: the condition under which inference gives prop this
+        value, as True, False, ('is', property, value), ('not', condition), ('all', [conditions]) or
+        ('any', [conditions]). A derived property has a value when some rule deriving it fires and no rule
+        deriving another value does, and is contradictory when rules deriving different values both fire.
+
+        Returns None when the rules are not in evaluation order, derive base properties, or derive None or
+        'contradictory' as a value; then the outcome depends on the order in which rules fire.
+        """
+        base_properties = set(base_properties)
+        producers = {}
+        for rule in self.rules:
+            producers.setdefault(rule.consequent, []).append(rule)
+        if not self.ordered or base_properties & producers.keys() or any(
+            rule.consequent_value is None or rule.consequent_value == 'contradictory' for rule in self.rules
+        ):
+            return None
+        conditions = {}
+
+        def combine(operator, items, neutral):
+            flat = []
+            for item in items:
+                if item is not neutral:
+                    flat.extend(item[1] if isinstance(item, tuple) and item[0] == operator else [item])
+            if (not neutral) in flat:
+                return not neutral
+            return neutral if not flat else flat[0] if len(flat) == 1 else (operator, flat)
+
+        def any_of(items):
+            return combine('any', items, False)
+
+        def all_of(items):
+            return combine('all', items, True)
+
+        def negation(condition):
+            return not condition if isinstance(condition, bool) else ('not', condition)
+
+        def fires(rule):
+            return all_of([holds(antecedent, expected) for antecedent, expected in rule.antecedents.items()])
+
+        def holds(name, expected):
+            key = (name, expected)
+            if key in conditions:
+                return conditions[key]
+            if name in base_properties:
+                condition = ('is', name, expected)
+            elif name not in producers:
+                condition = expected is None  # Never known
+            elif expected is None:
+                condition = negation(any_of([fires(rule) for rule in producers[name]]))
+            elif expected == 'contradictory':
+                condition = any_of([
+                    all_of([fires(first), fires(second)])
+                    for i, first in enumerate(producers[name]) for second in producers[name][i + 1:]
+                    if first.consequent_value != second.consequent_value
+                ])
+            else:
+                condition = all_of([
+                    any_of([fires(rule) for rule in producers[name] if rule.consequent_value == expected]),
+                    negation(any_of([fires(rule) for rule in producers[name] if rule.consequent_value != expected])),
+                ])
+            conditions[key] = condition
+            return condition
+
+        return holds(prop, value)
+
+    def batch_inference(self, table: pd.DataFrame) -> BatchInference:
+        """
+        Runs inference for every row of the table at once; each column is a known property. Rules are
+        evaluated as boolean masks over the rows, sweeping over them in order until no row changes (or once, if
+        the rules are in evaluation order), so every row gets the same results as InferenceEngine.inference.
+        """
+        rows = len(table)
+        rule_set = self.rule_set
+        # Values are compared as the rule set's integer codes; equal values share a code, like == in inference
+        codes = dict(self.codes)
+
+        def code(value):
+            # NaN equals nothing, not even itself
+            return -1 if value != value else codes.setdefault(value, len(codes))
+
+        values = []
+        known = []
+        for prop in rule_set.properties:
+            if prop in table.columns:
+                column = table[prop].to_numpy(dtype=object)
+                positions, uniques = pd.factorize(column)
+                coded = np.array([code(value) for value in uniques] + [-1])[positions]
+                missing = np.flatnonzero(positions < 0)
+                coded[missing] = [-1 if column[i] is not None else self.none for i in missing]
+                values.append(coded)
+                known.append(np.ones(rows, dtype=bool))
+            else:
+                # Unknown properties read as None, like in inference
+                values.append(np.full(rows, self.none))
+                known.append(np.zeros(rows, dtype=bool))
+        consequents = list(dict.fromkeys(rule.consequent for rule in self.rules))
+        explanation_rules = {prop: np.full(rows, -1) for prop, _ in rule_set.conclusions}
+        order = {prop: np.full(rows, -1) for prop, _ in rule_set.conclusions}
+        contradictory = self.contradictory
+
+        sweep = 0
+        changed = np.ones(rows, dtype=bool)
+        while changed.any():
+            changed = np.zeros(rows, dtype=bool)
+            for position in range(len(self.rules)):
+                fires = np.ones(rows, dtype=bool)
+                for prop, value in rule_set.conditions[position]:
+                    fires &= values[prop] == value
+                if not fires.any():
+                    continue
+                c, value = self.conclusions[position]
+                new = fires & ~known[c]
+                contradiction = fires & known[c] & (values[c] != value) & (values[c] != contradictory)
+                first = (new | contradiction) & (order[c] < 0)
+                order[c][first] = sweep * len(self.rules) + position
+                values[c][new] = value
+                known[c] |= new
+                explanation_rules[c][new] = position
+                values[c][contradiction] = contradictory
+                explanation_rules[c][contradiction] = -1
+                changed |= new | contradiction
+            sweep += 1
+            if self.ordered:
+                break
 
-# Inference rules
-rules = [
-    Rule(
-        {'pricerange': 'cheap', 'food_quality': 'good'},
-        'touristic',
-        True,
-        "Cheap price and good food make it appealing to tourists."
-    ),
-    Rule(
-        {'food': 'romanian'},
-        'touristic',
-        False,
-        "Romanian food is not commonly sought by tourists."
-    ),
-    Rule(
-        {'crowdedness': 'busy'},
-        'assigned_seats',
-        True,
-        "Busy restaurants need assigned seats to manage guests."
-    ),
-    Rule(
-        {'length_of_stay': 'long'},
-        'children',
-        False,
-        "Long stays are not suitable for children."
-    ),
-    Rule(
-        {'crowdedness': 'busy'},
-        'romantic',
-        False,
-        "Busy environments are not conducive to romance."
-    ),
-    Rule(
-        {'length_of_stay': 'long'},
-        'romantic',
-        True,
-        "Long stays are ideal for romantic experiences."
-    ),
-]
+        # Decode to the values inference would infer: the consequent value of the first rule deriving it
+        decoded = np.empty(len(codes), dtype=object)
+        for value, i in codes.items():
+            decoded[i] = value
+        for position in reversed(range(len(self.rules))):
+            decoded[rule_set.conclusions[position][1]] = self.rules[position].consequent_value
+        decoded[contradictory] = 'contradictory'
+        indices = {prop: self.property_indices[prop] for prop in consequents}
+        order = pd.DataFrame({prop: order[i] for prop, i in indices.items()}, index=table.index, columns=consequents)
+        inferred = pd.DataFrame(
+            {prop: decoded[np.maximum(values[i], 0)] for prop, i in indices.items()},
+            index=table.index, columns=consequents, dtype=object
+        ).where(order >= 0)
+        explanation_rules = pd.DataFrame(
+            {prop: explanation_rules[i] for prop, i in indices.items()}, index=table.index, columns=consequents
+        )
+        return BatchInference(self.rules, inferred, explanation_rules, order)
@@ -0,0 +1,310 @@
+# assignment_1c/rule_set.py
+# The inference rules are declared in data/rules.json and compiled once into Rule objects plus a static
+# analysis of how they depend on each other. The compiled rule set is cached in data/compiled/ under a digest
+# of the file, so other processes load it without validating and analysing the rules again.
+#
+# Each rule in the file is an object:
+#   {"antecedents": {"crowdedness": "busy"}, "consequent": "romantic", "value": false, "explanation": "..."}
+# Run python -m assignment_1c.rule_set [path] to print the analysis of a rule file.
+
+import argparse
+import hashlib
+import heapq
+import json
+import logging
+import os
+import pickle
+import sys
+from typing import List, Dict
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+rules_path = os.path.join(data_dir, "rules.json")
+cache_dir = os.path.join(data_dir, "compiled")
+
+logger = logging.getLogger(__name__)
+
+# Bump when RuleSet changes, so caches written by older code are not loaded
+FORMAT_VERSION = 1
+
+RULE_KEYS = {'antecedents', 'consequent', 'value', 'explanation'}
+
+
+class Literal:
+    __slots__ = ('name', 'truth_value')
+
+    def __init__(self, name: str, truth_value):
+        self.name = name
+        self.truth_value = truth_value
+
+    def __eq__(self, other):
+        return self.name == other.name and self.truth_value == other.truth_value
+
+    def __repr__(self):
+        return f"{self.name} = {self.truth_value}"
+
+
+class Rule:
+    """Rules are in conjunctive normal form: (p ∧ ... ∧ q -> c)"""
+    __slots__ = ('antecedents', 'consequent', 'consequent_value', 'explanation')
+
+    def __init__(self, antecedents: Dict[str, any], consequent: str, consequent_value, explanation: str):
+        self.antecedents = antecedents  # Dict of property names and their expected values
+        self.consequent = consequent
+        self.consequent_value = consequent_value
+        self.explanation = explanation  # Explanation string
+
+
+class RuleSet:
+    """
+    Compiled rules with their static analysis.
+
+    properties   every property name, interned, in order of appearance
+    codes        value -> integer code, shared by all properties; equal values share a code
+    conditions   per rule, the (property index, value code) pairs of its antecedents
+    conclusions  per rule, the (property index, value code) pair of its consequent
+    dependencies derived property -> the properties its rules read
+    cycles       groups of derived properties that (indirectly) depend on themselves
+    order        rule positions such that every rule comes after the rules deriving what it reads;
+                 None when there are cycles. Ties keep the file order.
+    conflicts    (position, position) pairs of rules that can both fire with different values for the same
+                 consequent, making it contradictory
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.properties = []
+        property_indices = {}
+        self.codes = {}
+
+        def property_index(name):
+            if name not in property_indices:
+                property_indices[name] = len(self.properties)
+                self.properties.append(name)
+            return property_indices[name]
+
+        def code(value):
+            return self.codes.setdefault(value, len(self.codes))
+
+        self.conditions = [
+            tuple((property_index(prop), code(value)) for prop, value in rule.antecedents.items()) for rule in rules
+        ]
+        self.conclusions = [(property_index(rule.consequent), code(rule.consequent_value)) for rule in rules]
+
+        self.dependencies = {}
+        for rule in rules:
+            self.dependencies.setdefault(rule.consequent, set()).update(rule.antecedents)
+        self.cycles = self._find_cycles()
+        self.order = None if self.cycles else self._evaluation_order()
+        self.conflicts = self._find_conflicts()
+
+    def __len__(self):
+        return len(self.rules)
+
+    @property
+    def ordered(self) -> bool:
+        """Whether the file order already is an evaluation order."""
+        return self.order == list(range(len(self.rules)))
+
+    def _find_cycles(self) -> list:
+        """Strongly connected components of the derived properties (Tarjan), keeping those that are cycles."""
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+
+        def visit(prop):
+            index[prop] = lowlink[prop] = len(index)
+            stack.append(prop)
+            on_stack.add(prop)
+            for dependency in self.dependencies.get(prop, ()):
+                if dependency not in self.dependencies:
+                    continue  # A base property
+                if dependency not in index:
+                    visit(dependency)
+                    lowlink[prop] = min(lowlink[prop], lowlink[dependency])
+                elif dependency in on_stack:
+                    lowlink[prop] = min(lowlink[prop], index[dependency])
+            if lowlink[prop] == index[prop]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == prop:
+                        break
+                if len(component) > 1 or prop in self.dependencies[prop]:
+                    cycles.append(sorted(component))
+
+        for prop in self.dependencies:
+            if prop not in index:
+                visit(prop)
+        return cycles
+
+    def _evaluation_order(self) -> list:
+        """Topological order of the rules (Kahn), taking the earliest ready rule first."""
+        producers = {}
+        for position, rule in enumerate(self.rules):
+            producers.setdefault(rule.consequent, []).append(position)
+        readers = [[] for _ in self.rules]
+        waiting = []
+        for position, rule in enumerate(self.rules):
+            dependencies = [producer for prop in rule.antecedents for producer in producers.get(prop, ())]
+            for producer in dependencies:
+                readers[producer].append(position)
+            waiting.append(len(dependencies))
+        ready = [position for position, count in enumerate(waiting) if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            position = heapq.heappop(ready)
+            order.append(position)
+            for reader in readers[position]:
+                waiting[reader] -= 1
+                if waiting[reader] == 0:
+                    heapq.heappush(ready, reader)
+        return order
+
+    def _find_conflicts(self) -> list:
+        """Pairs of rules deriving different values for a property whose antecedents can hold together."""
+        by_consequent = {}
+        for position, (prop, _) in enumerate(self.conclusions):
+            by_consequent.setdefault(prop, []).append(position)
+        conflicts = []
+        for positions in by_consequent.values():
+            for i, first in enumerate(positions):
+                for second in positions[i + 1:]:
+                    if self.conclusions[first][1] == self.conclusions[second][1]:
+                        continue
+                    required = dict(self.conditions[first])
+                    if all(required.get(prop, value) == value for prop, value in self.conditions[second]):
+                        conflicts.append((first, second))
+        return conflicts
+
+
+def _check_value(value, where: str):
+    if not isinstance(value, (str, bool, int, float, type(None))):
+        raise ValueError(f"{where}: expected a string, number, boolean or null, got {json.dumps(value)}")
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _check_property(name, where: str) -> str:
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"{where}: property names must be non-empty strings, got {json.dumps(name)}")
+    return sys.intern(name)
+
+
+def compile_rules(entries: list, source: str = "rules") -> RuleSet:
+    """Validates the parsed rule file and compiles it; raises ValueError naming the first invalid rule."""
+    if not isinstance(entries, list):
+        raise ValueError(f"{source}: expected a list of rules")
+    rules = []
+    for position, entry in enumerate(entries):
+        where = f"{source}: rule {position}"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expected an object")
+        if entry.keys() != RULE_KEYS:
+            missing, unknown = RULE_KEYS - entry.keys(), entry.keys() - RULE_KEYS
+            raise ValueError(f"{where}: missing keys {sorted(missing)}, unknown keys {sorted(unknown)}")
+        if not isinstance(entry['antecedents'], dict):
+            raise ValueError(f"{where}: antecedents must be an object of property names and values")
+        if not isinstance(entry['explanation'], str):
+            raise ValueError(f"{where}: explanation must be a string")
+        antecedents = {
+            _check_property(prop, where): _check_value(value, where) for prop, value in entry['antecedents'].items()
+        }
+        rules.append(Rule(
+            antecedents,
+            _check_property(entry['consequent'], where),
+            _check_value(entry['value'], where),
+            entry['explanation'],
+        ))
+    return RuleSet(rules)
+
+
+def cached_path(digest: str, path: str = rules_path) -> str:
+    """rules.json becomes compiled/rules-<digest>.pickle"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest[:16]}.pickle")
+
+
+def report(rule_set: RuleSet, source: str):
+    """
+    Logs what the analysis found when a file is compiled. Cycles are warned about; conflicts are how the rules
+    express contradictions, so they are only logged at INFO (python -m assignment_1c.rule_set prints them).
+    """
+    for cycle in rule_set.cycles:
+        logger.warning("%s: %s depend on each other; the rules are swept over until nothing new is inferred",
+                       source, ' <-> '.join(cycle))
+    for first, second in rule_set.conflicts:
+        logger.info("%s: rules %d and %d can both fire and make %s contradictory",
+                    source, first, second, rule_set.rules[first].consequent)
+
+
+def load_rules(path: str = rules_path) -> RuleSet:
+    """
+    The compiled rules of the file, loaded from the cache when the file was compiled before.
+    Otherwise the rules are compiled, the analysis is logged and the cache is replaced.
+    """
+    with open(path, 'rb') as file:
+        contents = file.read()
+    digest = hashlib.sha256(contents + f"\0{FORMAT_VERSION}".encode('utf-8')).hexdigest()
+    compiled_path = cached_path(digest, path)
+    try:
+        with open(compiled_path, 'rb') as file:
+            return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        pass
+
+    rule_set = compile_rules(json.loads(contents), os.path.basename(path))
+    report(rule_set, os.path.basename(path))
+    # The cache only saves time; on a read-only install the rules are compiled in every process instead
+    temporary_path = f"{compiled_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(rule_set, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, compiled_path)
+    except OSError as error:
+        logger.info("Could not cache the compiled rules in %s: %s", cache_dir, error)
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        return rule_set
+    # Compiled versions of earlier contents of the file are no longer needed. Another process may be removing
+    # them at the same time.
+    prefix = os.path.basename(compiled_path).rsplit('-', 1)[0] + '-'
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        names = []
+    for name in names:
+        if name.startswith(prefix) and name.endswith('.pickle') and name != os.path.basename(compiled_path):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+    return rule_set
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a rule file and print its static analysis.")
+    parser.add_argument("path", nargs='?', default=rules_path)
+    args = parser.parse_args()
+
+    rule_set = load_rules(args.path)
+    derived = list(rule_set.dependencies)
+    print(f"{len(rule_set)} rules, {len(rule_set.properties)} properties, {len(derived)} derived: {', '.join(derived)}")
+    for prop, dependencies in rule_set.dependencies.items():
+        print(f"  {prop} <- {', '.join(sorted(dependencies)) or '(unconditional)'}")
+    if rule_set.cycles:
+        for cycle in rule_set.cycles:
+            print(f"cycle: {' <-> '.join(cycle)}")
+    elif rule_set.ordered:
+        print("rules are in evaluation order")
+    else:
+        print(f"evaluation order: {rule_set.order}")
+    for first, second in rule_set.conflicts:
+        a, b = rule_set.rules[first], rule_set.rules[second]
+        print(f"conflict on {a.consequent}: rule {first} ({a.consequent_value}) and rule {second} ({b.consequent_value})")
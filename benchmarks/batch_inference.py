@@ -0,0 +1,54 @@
+# batch_inference.py
+# Inference over a whole restaurant catalog: InferenceEngine.inference on every row versus
+# InferenceEngine.batch_inference, which evaluates each rule as a mask over all rows.
+# Rows are drawn independently per column, so almost every row is a distinct input; the shipped rules and a
+# random chained rule set are both run, and every row is checked to get identical results, including their order.
+# Run from the root directory: python -m benchmarks.batch_inference [--rows 20000]
+
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from assignment_1b.lookup_restaurant import INFERENCE_COLUMNS
+from assignment_1c.reasoner import InferenceEngine, Literal, RuleSet
+from assignment_1c.rule_set import load_rules
+from benchmarks.reasoner_scaling import random_rules
+
+csv_path = os.path.join("data", "restaurant_info_extended.csv")
+
+
+def compare(name: str, engine: InferenceEngine, table: pd.DataFrame):
+    start = time.perf_counter()
+    before = [
+        engine.inference([Literal(prop, value) for prop, value in zip(table.columns, known)])
+        for known in table.itertuples(index=False, name=None)
+    ]
+    per_row_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = engine.batch_inference(table)
+    batch_time = time.perf_counter() - start
+    identical = sum(
+        list(a[0].items()) == list(b[0].items()) and list(a[1].items()) == list(b[1].items())
+        for a, b in zip(before, (batch.row(i) for i in range(len(table))))
+    )
+    print(f"{name}: {len(engine.rules)} rules over {len(table)} rows")
+    print(f"  per-row inference  {1000 * per_row_time:10.1f} ms")
+    print(f"  batch inference    {1000 * batch_time:10.1f} ms")
+    print(f"  {identical} identical rows of {len(table)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time inference over a whole restaurant catalog.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    restaurants = pd.read_csv(csv_path)
+    catalog = pd.DataFrame({
+        column: rng.choice(restaurants[column].dropna().unique(), args.rows) for column in INFERENCE_COLUMNS
+    })
+    compare("shipped rules", InferenceEngine(load_rules()), catalog)
+
+    base = pd.DataFrame({f"base_{p}": rng.choice([f"value_{v}" for v in range(4)], args.rows) for p in range(10)})
+    compare("random chained rules", InferenceEngine(RuleSet(random_rules(100))), base)
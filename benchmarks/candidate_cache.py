@@ -0,0 +1,61 @@
+# candidate_cache.py
+# Repeated candidate lookups, as the dialogue manager makes them across sessions: the categorical index
+# on every call versus RestaurantLookup's candidate cache, on the restaurant table replicated to a large catalog.
+# Run from the root directory: python -m benchmarks.candidate_cache [--rows 100000] [--lookups 20000]
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+import pandas as pd
+from assignment_1b.restaurant_store import store_dir_for
+from assignment_1b.lookup_restaurant import RestaurantLookup
+
+csv_path = os.path.join("data", "restaurant_info_extended.csv")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time cached versus uncached candidate lookups.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    table = pd.read_csv(csv_path)
+    data = pd.concat([table] * -(-args.rows // len(table)), ignore_index=True)
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+        data.to_csv(file, index=False)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            lookup = RestaurantLookup(file.name)
+    finally:
+        os.unlink(file.name)
+        shutil.rmtree(store_dir_for(file.name), ignore_errors=True)
+
+    # Users mostly ask for the popular combinations; draw them with a skewed distribution
+    combinations = table[['pricerange', 'area', 'food']].dropna().drop_duplicates().values.tolist()
+    random.seed(0)
+    random.shuffle(combinations)
+    weights = [1 / (rank + 1) for rank in range(len(combinations))]
+    queries = [
+        {'price_range': price, 'location': area, 'food_type': food}
+        for price, area, food in random.choices(combinations, weights, k=args.lookups)
+    ]
+
+    start = time.perf_counter()
+    uncached = [lookup.state.index.positions(query) for query in queries]
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cached = [lookup.candidate_positions(query) for query in queries]
+    cache_time = time.perf_counter() - start
+
+    print(f"{len(queries)} lookups of {len(combinations)} distinct preferences over {len(data)} restaurants")
+    print(f"  index every call  {1e6 * index_time / len(queries):10.2f} us/lookup")
+    print(f"  candidate cache   {1e6 * cache_time / len(queries):10.2f} us/lookup")
+    print(f"  cache stats: {lookup.cache_stats()}")
+    mismatches = sum(not (a == b).all() for a, b in zip(uncached, cached))
+    print(f"  {len(queries) - mismatches} identical, {mismatches} different")
@@ -0,0 +1,132 @@
+# dialogue_server.py
+# Many simultaneous users against one `main.py --serve` process: scripted dialogues run concurrently over
+# HTTP versus the same dialogues run one after another on DialogueManager directly (one user per process,
+# without counting each process's startup). Every transcript is checked to be identical.
+# Run from the root directory: python -m benchmarks.dialogue_server [--sessions 200]
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import statistics
+import time
+import pandas as pd
+import assignment_1c.config
+from main import initialize_states
+from assignment_1a.registry import load_serving_model
+from assignment_1a.prediction_cache import CachedModel
+from assignment_1b.extract_preferences import PreferenceExtractor
+from assignment_1b.lookup_restaurant import RestaurantLookup
+from assignment_1b.Dialogue_manager import DialogueManager
+from assignment_1b.dialogue_server import DialogueServer
+
+csv_path = os.path.join("data", "restaurant_info_extended.csv")
+
+
+def scripts(count: int) -> list:
+    """User turns of one dialogue per session: preferences, confirmations, a requirement, one alternative, goodbye."""
+    random.seed(0)
+    combinations = pd.read_csv(csv_path)[['pricerange', 'area', 'food']].dropna().drop_duplicates().values.tolist()
+    requirements = ["i want a romantic place", "somewhere touristic", "no", "good for children please"]
+    result = []
+    for _ in range(count):
+        price, area, food = random.choice(combinations)
+        requirement = random.choice(requirements)
+        turns = [f"i am looking for a {price} {food} restaurant in the {area}", "yes", "yes", "yes", requirement]
+        if requirement != "no":
+            turns.append("yes")
+        result.append(turns + ["yes", "no thank you goodbye"])
+    return result
+
+
+def run_directly(shared: tuple, turns: list) -> list:
+    """The dialogue on the console loop, with answers from the script instead of input()."""
+    messages = []
+    dialogue_manager = DialogueManager(initialize_states(messages.append), *shared)
+    dialogue_manager.tm.speak()
+    transcript = []
+    for text in turns:
+        if not dialogue_manager.awaiting_input():
+            break
+        transcript.append([message for message in messages if message])
+        messages.clear()
+        dialogue_manager.process_input(text)
+    dialogue_manager.awaiting_input()
+    transcript.append([message for message in messages if message])
+    return transcript
+
+
+async def request(reader, writer, method: str, path: str, payload=None) -> dict:
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    await reader.readline()
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode().partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return json.loads(await reader.readexactly(int(headers['content-length'])))
+
+
+async def run_session(port: int, turns: list, latencies: list) -> list:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        opened = await request(reader, writer, 'POST', '/sessions')
+        transcript = [opened['messages']]
+        for text in turns:
+            start = time.perf_counter()
+            replied = await request(reader, writer, 'POST', f"/sessions/{opened['session']}", {'text': text})
+            latencies.append(time.perf_counter() - start)
+            transcript.append(replied['messages'])
+            if replied['done']:
+                break
+        return transcript
+    finally:
+        writer.close()
+
+
+async def run_server(shared: tuple, all_turns: list, workers: int) -> tuple:
+    server = DialogueServer(initialize_states, *shared, workers=workers, max_sessions=len(all_turns))
+    listener = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    latencies = []
+    async with listener:
+        start = time.perf_counter()
+        transcripts = await asyncio.gather(*(run_session(port, turns, latencies) for turns in all_turns))
+        elapsed = time.perf_counter() - start
+    return transcripts, elapsed, latencies, server.stats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time concurrent dialogue sessions served by one process.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=assignment_1c.config.server_workers)
+    args = parser.parse_args()
+
+    all_turns = scripts(args.sessions)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        model = CachedModel(load_serving_model(), maxsize=assignment_1c.config.prediction_cache_size)
+        model.warm_from_dialog_acts(top=assignment_1c.config.prediction_cache_prewarm)
+        shared = (PreferenceExtractor(), model, RestaurantLookup())
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        start = time.perf_counter()
+        direct = [run_directly(shared, turns) for turns in all_turns]
+        direct_time = time.perf_counter() - start
+
+        served, served_time, latencies, stats = asyncio.run(run_server(shared, all_turns, args.workers))
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    turns = len(latencies)
+    latencies.sort()
+    print(f"{args.sessions} sessions, {turns} user turns, {args.workers} dialogue threads")
+    print(f"  one dialogue after another   {direct_time:8.2f} s   {turns / direct_time:8.0f} turns/s")
+    print(f"  concurrent over HTTP         {served_time:8.2f} s   {turns / served_time:8.0f} turns/s")
+    print(f"  turn latency under load      p50 {1000 * statistics.median(latencies):.1f} ms, "
+          f"p95 {1000 * latencies[int(0.95 * (turns - 1))]:.1f} ms")
+    print(f"  peak RSS growth while serving {(rss_after - rss_before) / 1024:.1f} MB")
+    print(f"  prediction cache hit rate {stats['prediction_cache']['hit_rate']:.3f}")
+    print(f"  {sum(a == b for a, b in zip(direct, served))} identical transcripts of {args.sessions}")
@@ -0,0 +1,98 @@
+# ffnn_runtime.py
+# Compares serving the feed-forward network with Keras and with its NumPy export:
+# output parity on the test split, load time, single-sentence latency and peak RSS.
+# Run from the root directory: python -m benchmarks.ffnn_runtime
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNTIMES = ["keras", "numpy"]
+
+
+def peak_rss_mb() -> float:
+    # VmHWM is reset on exec, unlike ru_maxrss which inherits the parent's peak
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def measure(runtime: str) -> dict:
+    """Loads one runtime in this (fresh) process and times it."""
+    start = time.perf_counter()
+    if runtime == "keras":
+        from assignment_1a.models import FeedForwardNNModel as model_class
+    else:
+        from assignment_1a.models import NumpyFeedForwardNNModel as model_class
+    model = model_class()
+    model.load_weights()
+    load_time = time.perf_counter() - start
+
+    from assignment_1a.read_data import corpus
+    sentences = corpus.test_sentences
+    latencies = []
+    for sentence in sentences[:200]:
+        start = time.perf_counter()
+        model.predict(sentence)
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict_batch(sentences)
+    batch_time = time.perf_counter() - start
+
+    return {
+        "load_s": load_time,
+        "latency_ms": statistics.median(latencies) * 1000,
+        "batch_sent_per_s": len(sentences) / batch_time,
+        "max_rss_mb": peak_rss_mb(),
+    }
+
+
+def check_parity(data_type: str):
+    """Asserts that the NumPy runtime reproduces the Keras probabilities and predictions."""
+    import numpy as np
+    from assignment_1a.models import FeedForwardNNModel, NumpyFeedForwardNNModel
+    from assignment_1a.read_data import corpus
+
+    keras_model = FeedForwardNNModel(data_type=data_type)
+    keras_model.load_weights()
+    numpy_model = NumpyFeedForwardNNModel(data_type=data_type)
+    numpy_model.load_weights()
+
+    sentences = corpus.test_sentences
+    keras_proba = keras_model.predict_proba_batch(sentences)
+    numpy_proba = numpy_model.predict_proba_batch(sentences)
+    assert keras_model.classes == numpy_model.classes
+    assert np.allclose(keras_proba, numpy_proba, atol=1e-5), np.abs(keras_proba - numpy_proba).max()
+    assert keras_model.predict_batch(sentences) == numpy_model.predict_batch(sentences)
+    print(f"Parity ({data_type}): {len(sentences)} sentences, max abs difference "
+          f"{np.abs(keras_proba - numpy_proba).max():.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Keras and NumPy feed-forward runtimes.")
+    parser.add_argument("--runtime", choices=RUNTIMES, help="measure a single runtime and print JSON")
+    args = parser.parse_args()
+
+    if args.runtime:
+        print(json.dumps(measure(args.runtime)))
+        sys.exit()
+
+    for data_type in ["normal", "dedup"]:
+        check_parity(data_type)
+
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    print(f"{'runtime':<10}{'load (s)':>10}{'latency (ms)':>14}{'batch (sent/s)':>16}{'max RSS (MB)':>14}")
+    for runtime in RUNTIMES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.ffnn_runtime", "--runtime", runtime],
+            capture_output=True, text=True, env=env, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{runtime:<10}{result['load_s']:>10.2f}{result['latency_ms']:>14.3f}"
+              f"{result['batch_sent_per_s']:>16,.0f}{result['max_rss_mb']:>14.0f}")
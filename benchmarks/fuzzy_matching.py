@@ -0,0 +1,66 @@
+# fuzzy_matching.py
+# Fuzzy keyword matching of PreferenceExtractor over the inform sentences in dialog_acts.dat:
+# Levenshtein distance from every word to every keyword (the previous implementation) versus
+# FuzzyMatcher's deletion index. Agreement counts sentences whose match is among the old tied matches.
+# Run from the root directory: python -m benchmarks.fuzzy_matching
+
+import time
+import Levenshtein as lev
+from assignment_1a.read_data import read_dialog_acts
+from assignment_1b.extract_preferences import PreferenceExtractor, fuzzy_stop_words
+from assignment_1b.fuzzy_matcher import FuzzyMatcher
+from assignment_1b.tokenizer import tokenize
+
+
+def pairwise_matches(user_input: str, keyword_list: list, stop_words) -> list:
+    """The previous loop, returning all tied matches instead of a random one."""
+    words = [word for word in tokenize(user_input) if word not in stop_words and len(word) > 4]
+    closest_matches = []
+    min_distance = float('inf')
+    for word in words:
+        for keyword in keyword_list:
+            distance = lev.distance(word, keyword)
+            max_distance = 1 if len(word) <= 5 else 2 if len(word) <= 8 else 3
+            if distance < min_distance and distance <= max_distance:
+                min_distance = distance
+                closest_matches = [keyword]
+            elif distance == min_distance and distance <= max_distance:
+                closest_matches.append(keyword)
+    return closest_matches
+
+
+if __name__ == "__main__":
+    labels, sentences = read_dialog_acts()
+    inform = [sentence.lower() for label, sentence in zip(labels, sentences) if label == 'inform']
+    extractor = PreferenceExtractor()
+    stop_words = fuzzy_stop_words()
+    keyword_lists = {
+        'food_type': extractor.food_keywords,
+        'price_range': extractor.price_keywords,
+        'location': extractor.location_keywords,
+    }
+
+    start = time.perf_counter()
+    matchers = {slot: FuzzyMatcher(keywords, stop_words) for slot, keywords in keyword_lists.items()}
+    build_time = time.perf_counter() - start
+    print(f"{len(inform)} inform sentences, index built in {build_time * 1000:.1f} ms")
+
+    for slot, keywords in keyword_lists.items():
+        start = time.perf_counter()
+        before = [pairwise_matches(sentence, keywords, stop_words) for sentence in inform]
+        pairwise_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        after = [matchers[slot].best(sentence) for sentence in inform]
+        index_time = time.perf_counter() - start
+
+        print(f"{slot}")
+        print(f"  pairwise     {pairwise_time:8.3f}s {len(inform) / pairwise_time:>12,.0f} sent/s")
+        print(f"  fuzzy index  {index_time:8.3f}s {len(inform) / index_time:>12,.0f} sent/s")
+        differences = [
+            (sentence, old, new) for sentence, old, new in zip(inform, before, after)
+            if not (new in old if old else new is None)
+        ]
+        print(f"  {len(inform) - len(differences)} agree, {len(differences)} differ, e.g.:")
+        for sentence, old, new in differences[:5]:
+            print(f"    {sentence!r}: {old} -> {new}")
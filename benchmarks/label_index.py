@@ -0,0 +1,49 @@
+# label_index.py
+# Cost of turning training labels into targets and predictions back into labels,
+# sorting the label set per call (the previous FeedForwardNNModel) versus a fitted LabelEncoder.
+# Run from the root directory: python -m benchmarks.label_index
+
+import time
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+from assignment_1a.read_data import corpus
+
+SAMPLE = 500
+
+
+def per_call_sort_index(labels, label):
+    return list(sorted(set(labels))).index(label)
+
+
+def per_call_sort_label(labels, index):
+    return list(sorted(set(labels)))[index]
+
+
+if __name__ == "__main__":
+    labels = corpus.train_label
+    indices = np.random.default_rng(0).integers(0, len(set(labels)), size=len(labels))
+
+    # Sorting per call is quadratic over the label list, so time a sample and extrapolate
+    start = time.perf_counter()
+    for label in labels[:SAMPLE]:
+        per_call_sort_index(labels, label)
+    sort_encode = (time.perf_counter() - start) / SAMPLE
+    start = time.perf_counter()
+    for index in indices[:SAMPLE]:
+        per_call_sort_label(labels, index)
+    sort_decode = (time.perf_counter() - start) / SAMPLE
+
+    start = time.perf_counter()
+    encoder = LabelEncoder().fit(labels)
+    encoder.transform(labels)
+    encoder_construction = time.perf_counter() - start
+    start = time.perf_counter()
+    encoder.classes_[indices].tolist()
+    encoder_decode = (time.perf_counter() - start) / len(indices)
+
+    print(f"Encoding {len(labels)} training labels (model construction):")
+    print(f"  sort per call:  {sort_encode * len(labels):10.3f}s (extrapolated from {SAMPLE})")
+    print(f"  LabelEncoder:   {encoder_construction:10.3f}s")
+    print("Decoding one prediction:")
+    print(f"  sort per call:  {sort_decode * 1e6:10.2f}us")
+    print(f"  LabelEncoder:   {encoder_decode * 1e6:10.2f}us")
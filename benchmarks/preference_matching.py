@@ -0,0 +1,54 @@
+# preference_matching.py
+# Keyword and synonym matching of PreferenceExtractor over the inform sentences in dialog_acts.dat:
+# substring scans per slot (the previous implementation) versus the single-pass phrase index.
+# Fuzzy matching is not included; see fuzzy_matching.py.
+# Run from the root directory: python -m benchmarks.preference_matching
+
+import time
+from assignment_1a.read_data import read_dialog_acts
+from assignment_1b.extract_preferences import PreferenceExtractor
+from assignment_1b.tokenizer import tokenize
+
+
+def substring_scan(extractor: PreferenceExtractor, user_input: str) -> dict:
+    """The previous per-slot checks, without the fuzzy fallback."""
+    def scan(no_preference_phrases, categories):
+        if any(phrase in user_input for phrase in no_preference_phrases):
+            return 'any'
+        for value, synonyms in categories:
+            for synonym in synonyms:
+                if synonym in user_input:
+                    return value
+        return None
+
+    food_categories = [('|'.join(c), [t]) for t, c in extractor.broader_food_categories.items()]
+    food_categories += list(extractor.cuisine_synonyms.items())
+    found = {
+        'food_type': scan(extractor.no_food_preference_phrases, food_categories),
+        'price_range': scan(extractor.no_price_preference_phrases, extractor.price_synonyms.items()),
+        'location': scan(extractor.no_location_preference_phrases, extractor.location_synonyms.items()),
+    }
+    return {slot: value for slot, value in found.items() if value is not None}
+
+
+if __name__ == "__main__":
+    labels, sentences = read_dialog_acts()
+    inform = [sentence.lower() for label, sentence in zip(labels, sentences) if label == 'inform']
+    extractor = PreferenceExtractor()
+
+    start = time.perf_counter()
+    scanned = [substring_scan(extractor, sentence) for sentence in inform]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [extractor.phrase_index.match(tokenize(sentence)) for sentence in inform]
+    index_time = time.perf_counter() - start
+
+    print(f"{len(inform)} inform sentences")
+    print(f"  substring scans  {scan_time:8.3f}s {len(inform) / scan_time:>12,.0f} sent/s")
+    print(f"  phrase index     {index_time:8.3f}s {len(inform) / index_time:>12,.0f} sent/s")
+
+    differences = [(s, a, b) for s, a, b in zip(inform, scanned, indexed) if a != b]
+    print(f"{len(differences)} sentences differ (substring matches inside other words), e.g.:")
+    for sentence, before, after in differences[:10]:
+        print(f"  {sentence!r}: {before} -> {after}")
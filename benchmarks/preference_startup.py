@@ -0,0 +1,73 @@
+# preference_startup.py
+# Startup and per-call cost of the preference extractor's text handling:
+# - importing assignment_1b.extract_preferences in a fresh interpreter, versus the NLTK import and
+#   downloads it used to run at module load;
+# - tokenizing an utterance for extract_additional_requirements, NLTK's word_tokenize versus tokenize.
+# The NLTK side is skipped when nltk (or its punkt data) is not available.
+# Run from the root directory: python -m benchmarks.preference_startup [--runs N]
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from assignment_1a.read_data import read_dialog_acts
+from assignment_1b.extract_preferences import PreferenceExtractor
+from assignment_1b.tokenizer import tokenize
+
+NLTK_STARTUP = "import nltk; nltk.download('stopwords', quiet=True); nltk.download('punkt', quiet=True)"
+EXTRACTOR_STARTUP = "from assignment_1b.extract_preferences import PreferenceExtractor; PreferenceExtractor()"
+
+
+def time_statement(statement: str, runs: int) -> list:
+    """Seconds taken by a fresh interpreter to run the statement, once per run."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list):
+    print(f"  {name:<32} min {min(timings):.3f}s, median {statistics.median(timings):.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time preference extractor startup and tokenization.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("Fresh interpreter:")
+    report("python -c pass", time_statement("pass", args.runs))
+    report("extractor import and init", time_statement(EXTRACTOR_STARTUP, args.runs))
+    try:
+        report("nltk import and downloads", time_statement(NLTK_STARTUP, args.runs))
+    except subprocess.CalledProcessError:
+        print("  nltk import and downloads        skipped (nltk is not installed)")
+
+    _, sentences = read_dialog_acts()
+    sentences = [sentence.lower() for sentence in sentences]
+    extractor = PreferenceExtractor()
+
+    print(f"\nPer call over {len(sentences)} sentences:")
+    start = time.perf_counter()
+    for sentence in sentences:
+        tokenize(sentence)
+    elapsed = time.perf_counter() - start
+    print(f"  {'tokenize':<32} {1e6 * elapsed / len(sentences):8.2f} us")
+    try:
+        from nltk.tokenize import word_tokenize
+        start = time.perf_counter()
+        for sentence in sentences:
+            word_tokenize(sentence)
+        elapsed = time.perf_counter() - start
+        print(f"  {'nltk word_tokenize':<32} {1e6 * elapsed / len(sentences):8.2f} us")
+    except (ImportError, LookupError):
+        print(f"  {'nltk word_tokenize':<32} skipped (nltk or its punkt data is not installed)")
+
+    start = time.perf_counter()
+    for sentence in sentences:
+        extractor.extract_additional_requirements(sentence)
+    elapsed = time.perf_counter() - start
+    print(f"  {'extract_additional_requirements':<32} {1e6 * elapsed / len(sentences):8.2f} us")
@@ -0,0 +1,99 @@
+# reasoner_scaling.py
+# Forward chaining over random rule sets of growing size: sweeping over every rule until nothing new is
+# inferred (the previous implementation) versus the indexed agenda of InferenceEngine.
+# Rules chain derived properties into each other and conflict, so contradictions are exercised too;
+# inferred properties and explanations are checked to be identical, including their order.
+# Run from the root directory: python -m benchmarks.reasoner_scaling [--rules 10 100 1000 5000] [--restaurants 200]
+
+import argparse
+import random
+import time
+from assignment_1c.reasoner import InferenceEngine, Literal, Rule, RuleSet
+from assignment_1c.rule_set import load_rules
+
+
+def sweep_inference(rule_list: list, knowledge: list) -> tuple:
+    """The previous InferenceEngine.inference."""
+    inferred = {}
+    explanations = {}
+    known = {lit.name: lit.truth_value for lit in knowledge}
+    while True:
+        new_inference = False
+        for r in rule_list:
+            if all(known.get(ant) == val for ant, val in r.antecedents.items()):
+                if r.consequent not in known:
+                    known[r.consequent] = r.consequent_value
+                    inferred[r.consequent] = r.consequent_value
+                    explanations[r.consequent] = r.explanation
+                    new_inference = True
+                elif known[r.consequent] != r.consequent_value and known[r.consequent] != 'contradictory':
+                    known[r.consequent] = 'contradictory'
+                    inferred[r.consequent] = 'contradictory'
+                    explanations[r.consequent] = f"Contradiction detected for {r.consequent}"
+                    new_inference = True
+        if not new_inference:
+            break
+    return inferred, explanations
+
+
+def random_rules(count: int, base_properties: int = 10, seed: int = 0) -> list:
+    """Rules over base properties with four values and derived boolean properties, about five rules per derived one."""
+    rng = random.Random(seed)
+    derived = [f"derived_{i}" for i in range(max(2, count // 5))]
+    generated = []
+    for i in range(count):
+        antecedents = {}
+        for _ in range(rng.randint(1, 3)):
+            if rng.random() < 0.6:
+                antecedents[f"base_{rng.randrange(base_properties)}"] = f"value_{rng.randrange(4)}"
+            else:
+                antecedents[rng.choice(derived)] = rng.random() < 0.5
+        consequent = rng.choice(derived)
+        generated.append(Rule(antecedents, consequent, rng.random() < 0.5, f"Rule {i} holds."))
+    return generated
+
+
+def random_knowledge(count: int, base_properties: int = 10, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [
+        [Literal(f"base_{p}", f"value_{rng.randrange(4)}") for p in range(base_properties)]
+        for _ in range(count)
+    ]
+
+
+def compare(rule_list: list, knowledge_sets: list):
+    engine = InferenceEngine(RuleSet(rule_list))
+    start = time.perf_counter()
+    before = [sweep_inference(rule_list, knowledge) for knowledge in knowledge_sets]
+    sweep_time = time.perf_counter() - start
+    start = time.perf_counter()
+    after = [engine.inference(knowledge) for knowledge in knowledge_sets]
+    agenda_time = time.perf_counter() - start
+    identical = sum(
+        list(a[0].items()) == list(b[0].items()) and list(a[1].items()) == list(b[1].items())
+        for a, b in zip(before, after)
+    )
+    inferred = sum(len(b[0]) for b in after) / len(after)
+    print(f"{len(rule_list):>7} {1000 * sweep_time / len(knowledge_sets):>12.3f} "
+          f"{1000 * agenda_time / len(knowledge_sets):>12.3f} {inferred:>10.1f} {identical:>6}/{len(knowledge_sets)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time forward chaining as the rule set grows.")
+    parser.add_argument("--rules", type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument("--restaurants", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rules':>7} {'sweep ms':>12} {'agenda ms':>12} {'inferred':>10} {'identical':>13}")
+    # The shipped rules over every combination of the restaurant properties they read
+    properties = {
+        'pricerange': ['cheap', 'moderate', 'expensive'], 'food_quality': ['good', 'bad'],
+        'food': ['romanian', 'british'], 'crowdedness': ['busy', 'not busy'], 'length_of_stay': ['long', 'short'],
+    }
+    combinations = [[]]
+    for name, values in properties.items():
+        combinations = [known + [Literal(name, value)] for known in combinations for value in values]
+    compare(load_rules().rules, combinations)
+    knowledge_sets = random_knowledge(args.restaurants)
+    for count in args.rules:
+        compare(random_rules(count), knowledge_sets)
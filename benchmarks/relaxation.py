@@ -0,0 +1,97 @@
+# relaxation.py
+# Preference relaxation for suggest_restaurant and suggest_alternative_restaurant: walking the eight
+# preference combinations with get_candidates and apply_inference_and_select (the previous implementation)
+# versus RestaurantLookup.plan_relaxation. Checks that both settle on the same combination and requirements
+# and that the planner's pick is one the walk could have made. Then pages through alternatives:
+# re-planning with every earlier suggestion excluded versus one rank_restaurants ranking.
+# Run from the root directory: python -m benchmarks.relaxation
+
+import contextlib
+import io
+import itertools
+import random
+import time
+from assignment_1b.lookup_restaurant import RestaurantLookup, PREFERENCE_COMBINATIONS
+
+
+def walk(lookup: RestaurantLookup, preferences: dict, requirements: dict, exclude=(), drop_requirements=True):
+    """The previous loops; returns the combination, the requirements used and the names that could be picked."""
+    for combination in PREFERENCE_COMBINATIONS:
+        candidates = lookup.get_candidates({k: preferences[k] for k in combination if k in preferences})
+        if candidates.empty:
+            continue
+        candidates = candidates[~candidates['restaurantname'].isin(exclude)]
+        if candidates.empty:
+            continue
+        if isinstance(lookup.apply_inference_and_select(candidates, requirements), dict):
+            names = candidates.loc[lookup.matching_restaurants(candidates, requirements), 'restaurantname']
+            return combination, requirements, set(names)
+        if drop_requirements:
+            return combination, {}, set(candidates['restaurantname'])
+    return None, requirements, set()
+
+
+if __name__ == "__main__":
+    with contextlib.redirect_stdout(io.StringIO()):
+        lookup = RestaurantLookup()
+    data = lookup.restaurant_data
+    prices = [None] + sorted(data['pricerange'].dropna().unique())
+    areas = [None] + sorted(data['area'].dropna().unique())
+    foods = [None, 'chinese|japanese|thai|korean|vietnamese'] + sorted(data['food'].dropna().unique())
+    requirement_sets = [{}, {'romantic': True}, {'children': True, 'touristic': True}, {'assigned_seats': False}]
+    random.seed(0)
+    cases = [
+        ({'price_range': price, 'location': area, 'food_type': food}, requirements,
+         set(random.sample(list(data['restaurantname']), 5)) if alternative else set(), alternative)
+        for price, area, food in itertools.product(prices, areas, foods)
+        for requirements in requirement_sets for alternative in (False, True)
+    ]
+    cases = cases[::7]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        walked = [walk(lookup, p, r, exclude, drop_requirements=not alt) for p, r, exclude, alt in cases]
+        walk_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        planned = [lookup.plan_relaxation(p, r, exclude, drop_requirements=not alt) for p, r, exclude, alt in cases]
+        plan_time = time.perf_counter() - start
+
+    print(f"{len(cases)} relaxations over {len(data)} restaurants")
+    print(f"  combination walk  {1000 * walk_time / len(cases):8.3f} ms")
+    print(f"  planner           {1000 * plan_time / len(cases):8.3f} ms")
+    disagreements = 0
+    for (combination, requirements, names), plan in zip(walked, planned):
+        picked = plan['selected']['restaurant']['restaurantname'] if plan['selected'] else None
+        if (combination, requirements) != (plan['combination'], plan['requirements']) or (names and picked not in names):
+            disagreements += 1
+    print(f"  {len(cases) - disagreements} agree, {disagreements} disagree")
+
+    # Alternatives: the order of repeated strict planning must match the ranking
+    page_cases = [(p, r) for p, r, _, alternative in cases if not alternative][::5]
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        replanned = []
+        for preferences, requirements in page_cases:
+            suggested, order = set(), []
+            while len(order) < 10:
+                plan = lookup.plan_relaxation(preferences, requirements, suggested, drop_requirements=False)
+                if plan['selected'] is None:
+                    break
+                name = plan['selected']['restaurant']['restaurantname']
+                order.append((name, PREFERENCE_COMBINATIONS.index(plan['combination'])))
+                suggested.add(name)
+            replanned.append(order)
+        replan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ranked = [
+            [(data.at[label, 'restaurantname'], level) for label, level in lookup.rank_restaurants(p, r, top_k=10)]
+            for p, r in page_cases
+        ]
+        rank_time = time.perf_counter() - start
+
+    print(f"{len(page_cases)} sessions paging through up to 10 alternatives")
+    print(f"  re-plan per alternative  {1000 * replan_time / len(page_cases):8.3f} ms/session")
+    print(f"  one ranking              {1000 * rank_time / len(page_cases):8.3f} ms/session")
+    print(f"  {sum(a == b for a, b in zip(replanned, ranked))} identical orders of {len(page_cases)}")
@@ -0,0 +1,75 @@
+# requirement_filter.py
+# Additional-requirement filtering over the restaurant table, replicated to a large catalog:
+# inference per candidate row on every call (the previous implementation) versus the inference
+# results RestaurantLookup precomputes at load time. Matching restaurants are checked to be identical.
+# Run from the root directory: python -m benchmarks.requirement_filter [--rows 2000]
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from assignment_1b.restaurant_store import store_dir_for
+from assignment_1b.lookup_restaurant import RestaurantLookup, INFERENCE_COLUMNS
+from assignment_1c.reasoner import InferenceEngine, Literal
+from assignment_1c.rule_set import load_rules
+
+csv_path = os.path.join("data", "restaurant_info_extended.csv")
+
+
+def per_row_matches(engine: InferenceEngine, candidates: pd.DataFrame, additional_requirements: dict) -> list:
+    """The previous loop: inference for every candidate, then the requirement check."""
+    matching = []
+    for label, restaurant in candidates.iterrows():
+        inferred, _ = engine.inference([Literal(name, restaurant[name]) for name in INFERENCE_COLUMNS])
+        if all(
+            inferred.get(req) != 'contradictory' and inferred.get(req) == value
+            for req, value in additional_requirements.items()
+        ):
+            matching.append(label)
+    return matching
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time additional-requirement filtering.")
+    parser.add_argument("--rows", type=int, default=2_000)
+    args = parser.parse_args()
+
+    table = pd.read_csv(csv_path)
+    data = pd.concat([table] * -(-args.rows // len(table)), ignore_index=True)
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+        data.to_csv(file, index=False)
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            lookup = RestaurantLookup(file.name)
+        print(f"{len(data)} restaurants loaded and inferred in {time.perf_counter() - start:.2f}s")
+    finally:
+        os.unlink(file.name)
+        shutil.rmtree(store_dir_for(file.name), ignore_errors=True)
+
+    engine = InferenceEngine(load_rules())
+    properties = ['touristic', 'romantic', 'children', 'assigned_seats']
+    requirement_sets = [
+        {req: value for req, value in zip(chosen, values)}
+        for size in (1, 2) for chosen in itertools.combinations(properties, size)
+        for values in itertools.product([True, False], repeat=size)
+    ]
+
+    start = time.perf_counter()
+    before = [per_row_matches(engine, data, requirements) for requirements in requirement_sets]
+    per_row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = [list(lookup.matching_restaurants(data, requirements)) for requirements in requirement_sets]
+    indexed_time = time.perf_counter() - start
+
+    print(f"{len(requirement_sets)} requirement sets over all {len(data)} restaurants")
+    print(f"  per-row inference  {1000 * per_row_time / len(requirement_sets):10.2f} ms/call")
+    print(f"  precomputed        {1000 * indexed_time / len(requirement_sets):10.2f} ms/call")
+    mismatches = sum(a != b for a, b in zip(before, after))
+    print(f"  {len(requirement_sets) - mismatches} identical, {mismatches} different")
@@ -0,0 +1,94 @@
+# requirement_planner.py
+# Selecting a restaurant for preferences plus additional requirements, on the restaurant table replicated
+# to a large catalog: the candidate frame followed by comparing the inferred property table (the previous
+# get_candidates + apply_inference_and_select) versus select_restaurant, which back-chains each requirement
+# to input-column conditions and applies them as cached index masks together with the preferences.
+# Selections are checked to be identical.
+# Run from the root directory: python -m benchmarks.requirement_planner [--rows 100000] [--queries 2000]
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from assignment_1b.restaurant_store import store_dir_for
+from assignment_1b.lookup_restaurant import RestaurantLookup, INFERENCE_COLUMNS
+
+csv_path = os.path.join("data", "restaurant_info_extended.csv")
+
+
+def table_selection(lookup: RestaurantLookup, preferences: dict, additional_requirements: dict):
+    """The previous path: candidate frame, inferred property table comparisons, best score."""
+    candidates = lookup.get_candidates(preferences)
+    if candidates.empty:
+        return None
+    state = lookup.state
+    positions = state.restaurant_data.index.get_indexer(candidates.index)
+    meets_requirements = np.ones(len(positions), dtype=bool)
+    for req_property, req_value in additional_requirements.items():
+        if req_property not in state.inferred_table or req_value == 'contradictory':
+            meets_requirements[:] = False
+            break
+        meets_requirements &= (state.inferred_table[req_property].to_numpy()[positions] == req_value)
+    positions = positions[meets_requirements]
+    if len(positions) == 0:
+        return None
+    # Every match meets all preferences and requirements, so only the static part of the score differs
+    return state.restaurant_data.index[positions[np.argmax(state.static_scores[positions])]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time requirement-aware restaurant selection.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    table = pd.read_csv(csv_path)
+    data = pd.concat([table] * -(-args.rows // len(table)), ignore_index=True)
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+        data.to_csv(file, index=False)
+    # The lookup checks the CSV for changes on every call, so it is removed at the end
+    with contextlib.redirect_stdout(io.StringIO()):
+        lookup = RestaurantLookup(file.name)
+
+    random.seed(0)
+    combinations = table[['pricerange', 'area', 'food']].dropna().drop_duplicates().values.tolist()
+    properties = ['touristic', 'romantic', 'children', 'assigned_seats']
+    requirement_sets = [{}] + [
+        dict(zip(chosen, values))
+        for size in (1, 2) for chosen in itertools.combinations(properties, size)
+        for values in itertools.product([True, False], repeat=size)
+    ]
+    queries = []
+    for _ in range(args.queries):
+        price, area, food = random.choice(combinations)
+        preferences = {'price_range': price, 'location': random.choice([area, 'any']), 'food_type': food}
+        queries.append((preferences, random.choice(requirement_sets)))
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            before = [table_selection(lookup, *query) for query in queries]
+            table_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            selected = [lookup.select_restaurant(*query) for query in queries]
+            planner_time = time.perf_counter() - start
+        after = [None if isinstance(result, str) else result['restaurant'].name for result in selected]
+    finally:
+        os.unlink(file.name)
+        shutil.rmtree(store_dir_for(file.name), ignore_errors=True)
+
+    print(f"{len(queries)} queries over {len(data)} restaurants")
+    print(f"  candidate frame + inferred table  {1000 * table_time / len(queries):8.3f} ms/query")
+    print(f"  planned requirement masks         {1000 * planner_time / len(queries):8.3f} ms/query")
+    print(f"  {sum(a == b for a, b in zip(before, after))} identical selections of {len(queries)}")
+    for req in properties:
+        condition = lookup.inference_engine.requirement_condition(req, True, INFERENCE_COLUMNS)
+        print(f"  {req}=True <- {condition}")
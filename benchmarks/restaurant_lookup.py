@@ -0,0 +1,67 @@
+# restaurant_lookup.py
+# Candidate retrieval over the restaurant table, replicated to a large catalog:
+# a DataFrame copy plus str.contains scans per slot (the previous implementation) versus RestaurantIndex.
+# Every query's candidates are checked to be identical.
+# Run from the root directory: python -m benchmarks.restaurant_lookup [--rows 100000]
+
+import argparse
+import itertools
+import os
+import time
+import pandas as pd
+from assignment_1b.restaurant_index import RestaurantIndex
+
+csv_path = os.path.join("data", "restaurant_info_extended.csv")
+
+
+def scan_candidates(data: pd.DataFrame, preferences: dict) -> pd.DataFrame:
+    """The previous get_candidates filters."""
+    filtered = data.copy()
+    price_range, location, food_type = (preferences.get(slot) for slot in ('price_range', 'location', 'food_type'))
+    if price_range and price_range.lower() != 'any':
+        filtered = filtered[filtered['pricerange'].str.lower().str.contains(price_range.lower(), na=False)]
+    if location and location.lower() != 'any':
+        filtered = filtered[filtered['area'].str.lower().str.contains(location.lower(), na=False)]
+    if food_type and food_type.lower() != 'any':
+        filtered = filtered[filtered['food'].str.lower().str.contains(food_type, na=False)]
+    return filtered
+
+
+def queries(data: pd.DataFrame) -> list:
+    """Every combination of one value (or no preference) per slot, as the dialogue manager's relaxation produces."""
+    prices = [None, 'any'] + sorted(data['pricerange'].dropna().unique())
+    areas = [None, 'any'] + sorted(data['area'].dropna().unique())
+    foods = [None, 'any', 'chinese|japanese|thai|korean|vietnamese', 'european'] + sorted(data['food'].dropna().unique())
+    return [
+        {'price_range': price, 'location': area, 'food_type': food}
+        for price, area, food in itertools.product(prices, areas, foods)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time restaurant candidate retrieval.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    table = pd.read_csv(csv_path)
+    data = pd.concat([table] * -(-args.rows // len(table)), ignore_index=True)
+    preferences = queries(table)
+    sample = preferences[::max(1, len(preferences) // 200)]
+
+    start = time.perf_counter()
+    index = RestaurantIndex(data)
+    print(f"{len(data)} restaurants, index built in {1000 * (time.perf_counter() - start):.1f} ms")
+
+    start = time.perf_counter()
+    scanned = [scan_candidates(data, query).index for query in sample]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [data.index[index.positions(query)] for query in sample]
+    index_time = time.perf_counter() - start
+
+    print(f"{len(sample)} queries")
+    print(f"  copy and scan  {1000 * scan_time / len(sample):8.3f} ms/query")
+    print(f"  index          {1000 * index_time / len(sample):8.3f} ms/query")
+    mismatches = sum(not a.equals(b) for a, b in zip(scanned, indexed))
+    print(f"  {len(sample) - mismatches} identical, {mismatches} different")
@@ -0,0 +1,64 @@
+# restaurant_store.py
+# Loading the restaurant table, replicated to a large catalog: pandas.read_csv with default dtypes
+# (the previous implementation) versus opening the memory-mapped columnar store, plus the cost of
+# rebuilding the store after the CSV changes.
+# Run from the root directory: python -m benchmarks.restaurant_store [--rows 100000]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from assignment_1b.restaurant_store import load_store, store_dir_for
+
+csv_path = os.path.join("data", "restaurant_info_extended.csv")
+
+
+def megabytes(frame: pd.DataFrame) -> float:
+    return frame.memory_usage(deep=True).sum() / 2 ** 20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time loading the restaurant table from CSV and from the store.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    table = pd.read_csv(csv_path)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "restaurants.csv")
+    try:
+        pd.concat([table] * -(-args.rows // len(table)), ignore_index=True).to_csv(path, index=False)
+
+        start = time.perf_counter()
+        load_store(path)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        from_csv = pd.read_csv(path)
+        csv_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = load_store(path)
+        from_store = store.to_frame()
+        store_time = time.perf_counter() - start
+
+        store_bytes = sum(os.path.getsize(os.path.join(root, name))
+                          for root, _, names in os.walk(store_dir_for(path)) for name in names)
+        print(f"{len(from_csv)} restaurants ({os.path.getsize(path) / 2 ** 20:.1f} MB CSV, "
+              f"{store_bytes / 2 ** 20:.1f} MB store)")
+        print(f"  read_csv     {1000 * csv_time:8.1f} ms {megabytes(from_csv):8.1f} MB in memory")
+        print(f"  store        {1000 * store_time:8.1f} ms {megabytes(from_store):8.1f} MB in memory")
+        print(f"  first build  {1000 * build_time:8.1f} ms")
+        identical = from_csv.astype(object).where(from_csv.notna(), None).equals(
+            from_store.astype(object).where(from_store.notna(), None))
+        print(f"  tables identical: {identical}")
+
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(",".join(map(str, table.iloc[0].tolist())) + "\n")
+        start = time.perf_counter()
+        reloaded = load_store(path)
+        print(f"  rebuild after a CSV change {1000 * (time.perf_counter() - start):8.1f} ms "
+              f"(version {store.version} -> {reloaded.version})")
+    finally:
+        shutil.rmtree(directory)
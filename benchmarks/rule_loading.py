@@ -0,0 +1,79 @@
+# rule_loading.py
+# Loading a large rule file: parsing, validating and analysing the JSON on every start versus loading
+# the compiled rule set cached under its digest, and the memory of the rules with and without __slots__.
+# Run from the root directory: python -m benchmarks.rule_loading [--rules 5000]
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from assignment_1c.rule_set import compile_rules, load_rules, cached_path, Rule
+from benchmarks.reasoner_scaling import random_rules
+
+
+class DictRule:
+    """Rule as it was declared before, with a __dict__ per instance."""
+
+    def __init__(self, antecedents, consequent, consequent_value, explanation):
+        self.antecedents = antecedents
+        self.consequent = consequent
+        self.consequent_value = consequent_value
+        self.explanation = explanation
+
+
+def allocated(rule_class, entries: list) -> int:
+    tracemalloc.start()
+    built = [rule_class(dict(e['antecedents']), e['consequent'], e['value'], e['explanation']) for e in entries]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time loading a large rule file.")
+    parser.add_argument("--rules", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = [
+        {'antecedents': rule.antecedents, 'consequent': rule.consequent,
+         'value': rule.consequent_value, 'explanation': rule.explanation}
+        for rule in random_rules(args.rules)
+    ]
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+        json.dump(entries, file)
+    try:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            with open(file.name, encoding='utf-8') as rule_file:
+                compiled = compile_rules(json.load(rule_file))
+        compile_time = (time.perf_counter() - start) / args.repeat
+
+        rule_set = load_rules(file.name)  # Writes the cache
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            cached = load_rules(file.name)
+        cached_time = (time.perf_counter() - start) / args.repeat
+    finally:
+        os.unlink(file.name)
+        compiled_dir = os.path.dirname(cached_path('', file.name))
+        stem = os.path.splitext(os.path.basename(file.name))[0]
+        for name in os.listdir(compiled_dir):
+            if name.startswith(stem + '-'):
+                os.remove(os.path.join(compiled_dir, name))
+
+    print(f"{len(rule_set)} rules, {len(rule_set.properties)} properties, {len(rule_set.cycles)} cycles, "
+          f"{len(rule_set.conflicts)} conflicting pairs")
+    print(f"  parse, validate and analyse  {1000 * compile_time:8.1f} ms")
+    print(f"  compiled cache               {1000 * cached_time:8.1f} ms")
+    same = all(
+        (a.antecedents, a.consequent, a.consequent_value, a.explanation)
+        == (b.antecedents, b.consequent, b.consequent_value, b.explanation)
+        for a, b in zip(compiled.rules, cached.rules)
+    ) and (compiled.order, compiled.conflicts, compiled.cycles) == (cached.order, cached.conflicts, cached.cycles)
+    print(f"  cached rule set identical: {same}")
+    print(f"  rules with __dict__  {allocated(DictRule, entries) / 1024:8.0f} KiB")
+    print(f"  rules with __slots__ {allocated(Rule, entries) / 1024:8.0f} KiB")
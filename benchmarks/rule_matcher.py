@@ -0,0 +1,39 @@
+# rule_matcher.py
+# RuleBasedModel over every sentence in dialog_acts.dat: one re.search per keyword (the previous
+# implementation) versus the compiled matcher, per sentence and in batch mode.
+# Run from the root directory: python -m benchmarks.rule_matcher
+
+import re
+import time
+from assignment_1a.read_data import corpus
+from assignment_1a.models import RuleBasedModel
+
+
+def search_per_keyword(rules: dict, sentence: str) -> str:
+    for dialog_act, keywords in rules.items():
+        for keyword in keywords:
+            if re.search(r'\b' + re.escape(keyword) + r'\b', sentence, re.IGNORECASE):
+                return dialog_act
+    return "inform"
+
+
+if __name__ == "__main__":
+    sentences = corpus.sentences
+    model = RuleBasedModel(corpus.train_sentences, corpus.train_label)
+
+    start = time.perf_counter()
+    reference = [search_per_keyword(model.rules, sentence) for sentence in sentences]
+    per_keyword = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [model.predict(sentence) for sentence in sentences]
+    compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = model.predict_batch(sentences)
+    batched = time.perf_counter() - start
+
+    assert single == reference and batch == reference, "compiled matcher disagrees with re.search per keyword"
+    print(f"{len(sentences)} sentences, identical predictions")
+    for name, seconds in [("re.search per keyword", per_keyword), ("compiled, per sentence", compiled), ("compiled, batch", batched)]:
+        print(f"  {name:<24}{seconds:8.3f}s {len(sentences) / seconds:>12,.0f} sent/s")
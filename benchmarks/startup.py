@@ -0,0 +1,45 @@
+# startup.py
+# Measures how long `python main.py` takes from process start until the welcome prompt is printed.
+# Run from the root directory: python -m benchmarks.startup [--runs N]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+WELCOME_MARKER = "DEBUG: Speaking prompt for state: 1. Welcome"
+
+
+def time_to_first_prompt(timeout=300.0) -> float:
+    """Starts main.py and returns the seconds until the welcome prompt has been printed."""
+    env = dict(os.environ, PYTHONUNBUFFERED="1", TF_CPP_MIN_LOG_LEVEL="3")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True, env=env
+    )
+    try:
+        seen_marker = False
+        for line in process.stdout:
+            if seen_marker:
+                # The line after the marker is the prompt itself
+                return time.perf_counter() - start
+            seen_marker = line.startswith(WELCOME_MARKER)
+            if time.perf_counter() - start > timeout:
+                break
+        raise RuntimeError("main.py exited before printing the welcome prompt")
+    finally:
+        process.kill()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time main.py boot to its first prompt.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = [time_to_first_prompt() for _ in range(args.runs)]
+    print(f"main.py boot to first prompt over {args.runs} runs: "
+          f"min {min(timings):.2f}s, median {statistics.median(timings):.2f}s, max {max(timings):.2f}s")
@@ -0,0 +1,36 @@
+# throughput.py
+# Classification throughput in sentences/second, one predict call per sentence versus predict_batch.
+# Run from the root directory: python -m benchmarks.throughput
+
+import time
+from assignment_1a.read_data import corpus
+from assignment_1a.models import (
+    MajorityClassModel, RuleBasedModel, DecisionTreeModel,
+    LogisticRegressionModel, FeedForwardNNModel
+)
+
+
+def sentences_per_second(predict, sentences) -> float:
+    start = time.perf_counter()
+    predict(sentences)
+    return len(sentences) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    sentences = corpus.test_sentences
+    models = [
+        MajorityClassModel(corpus.train_sentences, corpus.train_label),
+        RuleBasedModel(corpus.train_sentences, corpus.train_label),
+        DecisionTreeModel(),
+        LogisticRegressionModel(),
+        FeedForwardNNModel(corpus.train_data_bow, corpus.train_label),
+    ]
+    for model in models:
+        if hasattr(model, 'weights_path'):
+            model.load_weights()
+
+    print(f"{'model':<28}{'single (sent/s)':>18}{'batch (sent/s)':>18}")
+    for model in models:
+        single = sentences_per_second(lambda batch: [model.predict(sentence) for sentence in batch], sentences[:500])
+        batch = sentences_per_second(model.predict_batch, sentences)
+        print(f"{model.name:<28}{single:>18,.0f}{batch:>18,.0f}")
@@ -1,14 +1,16 @@
-import os
 from assignment_1b.transition_manager import TransitionManager, State
-from assignment_1a.read_data import train_data_bow, train_label
-from assignment_1a.models import DecisionTreeModel
+from assignment_1a.registry import load_serving_model
+from assignment_1a.prediction_cache import CachedModel
 from assignment_1b.extract_preferences import PreferenceExtractor
 from assignment_1b.lookup_restaurant import RestaurantLookup
 from assignment_1b.Dialogue_manager import DialogueManager
+from assignment_1b.dialogue_server import DialogueServer
+import argparse
+import asyncio
 import assignment_1c.config
 
-def initialize_states():
-    """Initializes all dialogue states and returns a TransitionManager."""
+def initialize_states(output=None):
+    """Initializes all dialogue states and returns a TransitionManager; output receives its system messages (default: print)."""
     # Define all states
     welcome = State("1. Welcome")
     welcome.prompt = "Hi there! What kind of restaurant are you looking for?" if not assignment_1c.config.use_formal_language else "Good day. How may I assist you in finding a suitable restaurant?"
@@ -109,20 +111,44 @@ def initialize_states():
     ]
 
     # Initialize TransitionManager with all states and starting with welcome
-    tm = TransitionManager(states, welcome)
+    tm = TransitionManager(states, welcome, output)
     return tm
 
 if __name__ == "__main__":
-    # Initialize the TransitionManager and model
-    tm = initialize_states()
+    parser = argparse.ArgumentParser(description="Restaurant recommendation dialogue system.")
+    parser.add_argument("--serve", action="store_true", help="serve many dialogues over HTTP instead of one on the console")
+    parser.add_argument("--host", default=assignment_1c.config.server_host)
+    parser.add_argument("--port", type=int, default=assignment_1c.config.server_port)
+    args = parser.parse_args()
+
     preference_extractor = PreferenceExtractor()
-    restaurant_lookup = RestaurantLookup()
-    model = DecisionTreeModel(train_data_bow, train_label)
-    
-    # Load the model weights
-    weights_path = os.path.join(os.getcwd(), "assignment_1a", "model_weights", "decision_tree_model_normal.joblib")
-    model.load_weights(weights_path)
-    
-    # Initialize the DialogueManager and start the conversation
-    dialogue_manager = DialogueManager(tm, preference_extractor, model, restaurant_lookup)
-    dialogue_manager.start_conversation()
+    restaurant_lookup = RestaurantLookup(
+        cache_size=assignment_1c.config.candidate_cache_size,
+        refresh_interval=assignment_1c.config.refresh_interval,
+    )
+    # Load the trained classifier selected in the serving config from its prebuilt artifact
+    model = load_serving_model()
+    # Repeated utterances ("yes", "thank you goodbye") are answered from the prediction cache
+    model = CachedModel(model, maxsize=assignment_1c.config.prediction_cache_size)
+    if assignment_1c.config.prediction_cache_prewarm:
+        model.warm_from_dialog_acts(top=assignment_1c.config.prediction_cache_prewarm)
+
+    if args.serve:
+        # Every session gets its own states; the extractor, lookup and model are shared
+        server = DialogueServer(
+            initialize_states, preference_extractor, model, restaurant_lookup,
+            workers=assignment_1c.config.server_workers,
+            max_sessions=assignment_1c.config.max_sessions,
+            session_timeout=assignment_1c.config.session_timeout,
+        )
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        # Initialize the TransitionManager and the DialogueManager and start the conversation
+        tm = initialize_states()
+        dialogue_manager = DialogueManager(tm, preference_extractor, model, restaurant_lookup)
+        dialogue_manager.start_conversation()
+    print(f"DEBUG: Prediction cache: {model.stats()}")
+    print(f"DEBUG: Candidate cache: {restaurant_lookup.cache_stats()}")